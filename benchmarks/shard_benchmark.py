@@ -0,0 +1,146 @@
+"""
+Measures how the sharded terminal throughput scales with the number of shard processes.
+
+Run from the repository root:
+    python -m benchmarks.shard_benchmark --max-shards 8 --output shards.json
+"""
+
+# External dependencies
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import time
+
+# Internal dependencies
+from src.shard import ShardedTerminal
+
+
+def build_commands(top_directories: int, fanout: int) -> list[str]:
+    """
+    Creates the commands that fill the tree.
+
+    Args:
+        top_directories (int): Top level directories, spread over the shards.
+        fanout (int): Subdirectories on each of the two levels below them.
+
+    Returns:
+        list[str]: 'mkdir -p' commands.
+    """
+
+    commands = []
+
+    for top in range(top_directories):
+        for middle in range(fanout):
+            leaves = " ".join(f"/t{top}/d{middle}/e{leaf}" for leaf in range(fanout))
+            commands.append(f"mkdir -p {leaves}")
+
+    return commands
+
+
+def query_commands(top_directories: int, queries: int) -> list[str]:
+    """
+    Creates the searches run on the tree, spread over the top level directories.
+
+    Args:
+        top_directories (int): Top level directories.
+        queries (int): Number of searches.
+
+    Returns:
+        list[str]: 'find' commands.
+    """
+
+    return [f"find /t{query % top_directories} e1*" for query in range(queries)]
+
+
+def run_benchmark(shards: int, top_directories: int, fanout: int, queries: int) -> dict:
+    """
+    Fills a sharded tree and runs the searches, timing both phases.
+
+    Args:
+        shards (int): Number of shard processes.
+        top_directories (int): Top level directories.
+        fanout (int): Subdirectories on each of the two levels below them.
+        queries (int): Number of searches.
+
+    Returns:
+        dict: commands per second of each phase.
+    """
+
+    terminal = ShardedTerminal(shards)
+    results = dict()
+
+    try:
+        # Terminal commands print their output, which would dominate the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            for phase, commands in (("mkdir", build_commands(top_directories, fanout)),
+                                    ("find", query_commands(top_directories, queries))):
+                start = time.perf_counter()
+                terminal.interpret_commands(commands)
+                seconds = time.perf_counter() - start
+
+                results[phase] = {"commands": len(commands), "seconds": seconds, "commands_per_second": len(commands) / seconds}
+    finally:
+        terminal.close()
+
+    return results
+
+
+def main(arguments: list[str] = None) -> int:
+    """
+    Command line entry point.
+
+    Returns:
+        int: exit status.
+    """
+
+    parser = argparse.ArgumentParser(description="Measures the sharded terminal throughput by number of shards.")
+    parser.add_argument("--max-shards", type=int, default=multiprocessing.cpu_count(), help="largest number of shard processes")
+    parser.add_argument("--top-directories", type=int, default=32, help="top level directories, spread over the shards")
+    parser.add_argument("--fanout", type=int, default=30, help="subdirectories on each level below the top level")
+    parser.add_argument("--queries", type=int, default=256, help="'find' commands run on the filled tree")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(arguments)
+
+    report = {
+        "config": {
+            "top_directories": args.top_directories,
+            "fanout": args.fanout,
+            "queries": args.queries,
+            "cpu_count": multiprocessing.cpu_count(),
+        },
+        "python": platform.python_version(),
+        "results": dict(),
+    }
+
+    shard_counts = []
+    shards = 1
+    while shards <= args.max_shards:
+        shard_counts.append(shards)
+        shards *= 2
+
+    for shards in shard_counts:
+        results = run_benchmark(shards, args.top_directories, args.fanout, args.queries)
+
+        # Speedup over a single shard
+        for phase, result in results.items():
+            single_shard = report["results"].get("1", results)[phase]
+            result["speedup"] = result["commands_per_second"] / single_shard["commands_per_second"]
+
+        report["results"][str(shards)] = results
+
+    document = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(document)
+
+    print(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Benchmarks the terminal commands on a synthetic directory tree.
+
+Run from the repository root:
+    python -m benchmarks.tree_benchmark --fanout 4 --depth 4 --output results.json
+    python -m benchmarks.tree_benchmark --baseline results.json
+"""
+
+# External dependencies
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+
+# Internal dependencies
+from src.terminal import Terminal
+from src.directory import Directory
+from src.interface import Interface
+
+
+class TreeBenchmark:
+    """
+    Builds a tree of configurable fan-out, depth and content size through the
+    terminal commands, timing each kind of operation.
+    """
+
+    # Operations, in the order they are run
+    OPERATIONS = ("mkdir", "touch", "nano", "cd", "ls", "cat", "rename", "mv", "interface", "rm -r")
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self, fanout: int, depth: int, content_size: int) -> None:
+        """
+        Args:
+            fanout (int): Subdirectories and files in each directory.
+            depth (int): Directory levels below the root.
+            content_size (int): Characters written in each file, at least 1 so 'nano' gets its content argument.
+        """
+
+        self.fanout = fanout
+        self.depth = depth
+        self.content = "x" * content_size
+
+        self.terminal: Terminal = None
+        self.directory_paths: list[str] = list()
+
+        # Time spent in the timed commands of the current operation
+        self.seconds = 0.0
+
+    # Methods --------------------------------------------------------------------------
+
+    def run(self) -> dict[str, dict]:
+        """
+        Runs every operation once, on a new tree.
+
+        Returns:
+            dict[str, dict]: operation count and elapsed seconds by operation.
+        """
+
+        self.terminal = Terminal(Directory("root"))
+        self.directory_paths = ["/"]
+
+        results = dict()
+
+        # Terminal commands print their output, which would dominate the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            for operation in TreeBenchmark.OPERATIONS:
+                method = getattr(self, "run_" + operation.replace(" -r", ""))
+
+                self.seconds = 0.0
+                operations = method()
+
+                results[operation] = {"operations": operations, "seconds": self.seconds}
+
+        return results
+
+
+    def timed(self, command: str) -> None:
+        """
+        Runs a command, adding its execution time to the current operation.
+        Navigation between the timed commands runs through the terminal directly.
+
+        Args:
+            command (str): Command, as typed by the user.
+        """
+
+        start = time.perf_counter()
+        self.terminal.interpret_command(command)
+        self.seconds += time.perf_counter() - start
+
+
+    def run_mkdir(self) -> int:
+        """
+        Creates the directories, level by level.
+        """
+
+        level = ["/"]
+
+        for _ in range(self.depth):
+            next_level = []
+
+            for path in level:
+                self.terminal.interpret_command(f"cd {path}")
+
+                names = [f"d{index}" for index in range(self.fanout)]
+                self.timed("mkdir " + " ".join(names))
+
+                next_level.extend(path.rstrip("/") + "/" + name for name in names)
+
+            self.directory_paths.extend(next_level)
+            level = next_level
+
+        return len(self.directory_paths) - 1
+
+
+    def run_touch(self) -> int:
+        """
+        Creates the files of every directory.
+        """
+
+        names = " ".join(f"f{index}" for index in range(self.fanout))
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+            self.timed(f"touch {names}")
+
+        return len(self.directory_paths) * self.fanout
+
+
+    def run_nano(self) -> int:
+        """
+        Writes the content of every file.
+        """
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+
+            for index in range(self.fanout):
+                self.timed(f"nano f{index} {self.content}")
+
+        return len(self.directory_paths) * self.fanout
+
+
+    def run_cd(self) -> int:
+        """
+        Navigates to every directory by its absolute path.
+        """
+
+        for path in self.directory_paths:
+            self.timed(f"cd {path}")
+
+        return len(self.directory_paths)
+
+
+    def run_ls(self) -> int:
+        """
+        Lists every directory.
+        """
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+            self.timed("ls")
+
+        return len(self.directory_paths)
+
+
+    def run_cat(self) -> int:
+        """
+        Reads every file.
+        """
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+
+            for index in range(self.fanout):
+                self.timed(f"cat f{index}")
+
+        return len(self.directory_paths) * self.fanout
+
+
+    def run_rename(self) -> int:
+        """
+        Renames every file.
+        """
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+
+            for index in range(self.fanout):
+                self.timed(f"rename f{index} r{index}")
+
+        return len(self.directory_paths) * self.fanout
+
+
+    def run_mv(self) -> int:
+        """
+        Moves every file into a new subdirectory of its directory.
+        """
+
+        for path in self.directory_paths:
+            self.terminal.interpret_command(f"cd {path}")
+            self.terminal.interpret_command("mkdir moved")
+
+            for index in range(self.fanout):
+                self.timed(f"mv r{index} moved")
+
+        return len(self.directory_paths) * self.fanout
+
+
+    def run_interface(self) -> int:
+        """
+        Builds the graph shown by the 'interface' command.
+        """
+
+        start = time.perf_counter()
+        Interface(self.terminal.root_directory).create_graph()
+        self.seconds += time.perf_counter() - start
+
+        # Each directory holds its files inside 'moved', plus 'moved' itself
+        return len(self.directory_paths) * (self.fanout + 2)
+
+
+    def run_rm(self) -> int:
+        """
+        Removes every directory, the deepest ones first.
+        """
+
+        for path in reversed(self.directory_paths[1:]):
+            parent_path, _, name = path.rpartition("/")
+
+            self.terminal.interpret_command(f"cd {parent_path or '/'}")
+            self.timed(f"rm -r {name}")
+
+        return len(self.directory_paths) - 1
+
+
+def run_benchmark(fanout: int, depth: int, content_size: int, repeat: int) -> dict:
+    """
+    Runs the benchmark several times and keeps the fastest run of each operation.
+
+    Args:
+        fanout (int): Subdirectories and files in each directory.
+        depth (int): Directory levels below the root.
+        content_size (int): Characters written in each file.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: configuration and results, JSON serializable.
+    """
+
+    best = dict()
+
+    for _ in range(repeat):
+        results = TreeBenchmark(fanout, depth, content_size).run()
+
+        for operation, result in results.items():
+            if operation not in best or result["seconds"] < best[operation]["seconds"]:
+                best[operation] = result
+
+    for result in best.values():
+        result["seconds_per_operation"] = result["seconds"] / max(result["operations"], 1)
+
+    return {
+        "config": {"fanout": fanout, "depth": depth, "content_size": content_size, "repeat": repeat},
+        "python": platform.python_version(),
+        "results": best,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> dict[str, dict]:
+    """
+    Compares the time per operation with a saved baseline.
+
+    Args:
+        report (dict): Current benchmark report.
+        baseline (dict): Saved benchmark report.
+        threshold (float): Allowed slowdown, 0.1 means 10%.
+
+    Returns:
+        dict[str, dict]: ratio to the baseline, and whether it's a regression, by operation.
+    """
+
+    comparison = dict()
+
+    if report["config"] != baseline["config"]:
+        print("warning: baseline was run with a different configuration", file=sys.stderr)
+
+    for operation, result in report["results"].items():
+        if operation not in baseline["results"]:
+            continue
+
+        baseline_seconds = baseline["results"][operation]["seconds_per_operation"]
+        ratio = result["seconds_per_operation"] / baseline_seconds if baseline_seconds > 0 else 1.0
+
+        comparison[operation] = {"ratio": ratio, "regression": ratio > 1 + threshold}
+
+    return comparison
+
+
+def main(arguments: list[str] = None) -> int:
+    """
+    Command line entry point.
+
+    Returns:
+        int: exit status, 1 if a regression was found.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmarks the terminal commands on a synthetic tree.")
+    parser.add_argument("--fanout", type=int, default=4, help="subdirectories and files in each directory")
+    parser.add_argument("--depth", type=int, default=4, help="directory levels below the root")
+    parser.add_argument("--content-size", type=int, default=64, help="characters written in each file")
+    parser.add_argument("--repeat", type=int, default=3, help="runs, the fastest one is kept")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="compare with a JSON report saved by --output")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before a regression")
+    args = parser.parse_args(arguments)
+
+    if args.content_size < 1:
+        parser.error("--content-size must be at least 1, 'nano' needs a content")
+
+    report = run_benchmark(args.fanout, args.depth, args.content_size, args.repeat)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["comparison"] = compare(report, json.load(baseline_file), args.threshold)
+
+        regressions = [operation for operation, result in report["comparison"].items() if result["regression"]]
+
+    document = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(document)
+
+    print(document)
+
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,19 @@
+# External dependencies
+import sys
+
 # Internal dependencies
 from src.terminal import Terminal
 from src.directory import Directory
-
-# Create user terminal
-user_terminal = Terminal(Directory("root"))
+from src.shard import ShardedTerminal
 
 if __name__ == "__main__":
     
+    # Create user terminal, 'python main.py --shards 4' spreads the tree over 4 processes
+    if "--shards" in sys.argv:
+        user_terminal = ShardedTerminal(int(sys.argv[sys.argv.index("--shards") + 1]))
+    else:
+        user_terminal = Terminal(Directory("root"))
+    
     user_terminal.command_clear("")
     
     while(True):
@@ -0,0 +1,318 @@
+# External dependencies
+import io
+import tarfile
+import zipfile
+
+# Internal dependencies
+from src.file import File
+from src.directory import Directory
+from src.traversal import preorder
+
+# Tar write modes by archive extension
+TAR_WRITE_MODES = {
+    ".tar": "w|",
+    ".tar.gz": "w|gz",
+    ".tgz": "w|gz",
+    ".tar.bz2": "w|bz2",
+    ".tar.xz": "w|xz",
+}
+
+# File contents are stored as text, this keeps binary entries lossless
+CONTENT_ENCODING = "utf-8"
+CONTENT_ERRORS = "surrogateescape"
+
+
+class Archive:
+    """
+    Reads and writes tar/zip archives from/to a directory subtree.
+    Entries are streamed one at a time, so only one file content is held in memory.
+    """
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self, directory: Directory) -> None:
+        """
+        Args:
+            directory (Directory): Directory the archive is loaded into or saved from.
+        """
+
+        self.directory = directory
+
+        # Last parent directory used while loading, entries usually come grouped by folder
+        self.last_parent_names: list[str] = None
+        self.last_parent: Directory = None
+        self.last_parent_error: str = None
+
+        # Childrens by name of the directories loaded into, so each entry is found without a scan
+        self.indexes: dict[Directory, dict] = dict()
+
+
+    # Methods --------------------------------------------------------------------------
+
+    def load(self, archive_path: str) -> int:
+        """
+        Loads a .tar, .tar.gz or .zip archive into the directory.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+
+        Returns:
+            int: number of entries loaded.
+        """
+
+        if archive_path.endswith(".zip"):
+            return self.load_zip(archive_path)
+
+        return self.load_tar(archive_path)
+
+
+    def load_tar(self, archive_path: str) -> int:
+        """
+        Loads a tar archive, with any compression, in streaming mode.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+
+        Returns:
+            int: number of entries loaded.
+        """
+
+        entries = 0
+
+        with tarfile.open(archive_path, "r|*") as archive:
+            for member in archive:
+
+                if member.isdir():
+                    entries += self.add_entry(member.name, None)
+
+                elif member.isfile():
+                    content = archive.extractfile(member).read()
+                    entries += self.add_entry(member.name, content)
+
+        return entries
+
+
+    def load_zip(self, archive_path: str) -> int:
+        """
+        Loads a zip archive, one entry at a time.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+
+        Returns:
+            int: number of entries loaded.
+        """
+
+        entries = 0
+
+        with zipfile.ZipFile(archive_path, "r") as archive:
+            for member in archive.infolist():
+
+                if member.is_dir():
+                    entries += self.add_entry(member.filename, None)
+                else:
+                    entries += self.add_entry(member.filename, archive.read(member))
+
+        return entries
+
+
+    def add_entry(self, entry_name: str, content: bytes) -> int:
+        """
+        Adds an archive entry to the directory, creating its parent directories.
+
+        Args:
+            entry_name (str): Entry path inside the archive.
+            content (bytes): File content, or None if the entry is a directory.
+
+        Returns:
+            int: 1 if the entry was added, 0 if it was skipped.
+        """
+
+        # Filtering empty and current directory names
+        names = [name for name in entry_name.split("/") if name not in ("", ".")]
+
+        # Refusing entries that would escape the directory
+        if len(names) == 0 or ".." in names:
+            return 0
+
+        if content is None:
+            parent_names, file_name = names, None
+        else:
+            parent_names, file_name = names[:-1], names[-1]
+
+        parent, error = self.get_parent(parent_names)
+        if parent is None:
+            print(f"archive: cannot create '{entry_name}': {error}")
+            return 0
+
+        if file_name is None:
+            return 1
+
+        content = content.decode(CONTENT_ENCODING, CONTENT_ERRORS)
+        childrens = self.indexes[parent]
+        child = childrens.get(file_name)
+
+        # Overwriting existing files, like tar does
+        if isinstance(child, File):
+            if not child.update_content(content):
+                print(f"archive: cannot write '{entry_name}': Disk quota exceeded")
+                return 0
+
+            return 1
+
+        if child is not None:
+            print(f"archive: cannot create '{entry_name}': Is a directory")
+            return 0
+
+        # Created with its content, so a file over the quota is never left empty in the tree
+        if not parent.add_child_file(File(parent, file_name, content), childrens):
+            print(f"archive: cannot create '{entry_name}': Disk quota exceeded")
+            return 0
+
+        return 1
+
+
+    def get_parent(self, parent_names: list[str]):
+        """
+        Gets, or creates, the parent directory of an entry.
+
+        Args:
+            parent_names (list[str]): Parent directory names, relative to the directory.
+
+        Returns:
+            tuple[Directory, str]: the parent directory and None, or None and why it couldn't be created.
+        """
+
+        if parent_names != self.last_parent_names:
+            self.last_parent, self.last_parent_error = self.directory.make_directories(parent_names, self.indexes)
+            self.last_parent_names = parent_names
+
+            if self.last_parent is not None and self.last_parent not in self.indexes:
+                self.indexes[self.last_parent] = self.last_parent.index_childrens()
+
+        return self.last_parent, self.last_parent_error
+
+
+    def save(self, archive_path: str) -> int:
+        """
+        Saves the directory subtree as a .tar, .tar.gz or .zip archive.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+
+        Returns:
+            int: number of entries saved.
+        """
+
+        if archive_path.endswith(".zip"):
+            return self.save_zip(archive_path)
+
+        for extension, mode in TAR_WRITE_MODES.items():
+            if archive_path.endswith(extension):
+                return self.save_tar(archive_path, mode)
+
+        raise ValueError(f"unsupported archive format: {archive_path}")
+
+
+    def save_tar(self, archive_path: str, mode: str) -> int:
+        """
+        Saves the directory subtree as a tar archive, in streaming mode.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+            mode (str): tarfile write mode.
+
+        Returns:
+            int: number of entries saved.
+        """
+
+        entries = 0
+
+        with tarfile.open(archive_path, mode) as archive:
+            for entry_name, file_object in self.walk():
+
+                member = tarfile.TarInfo(entry_name)
+                member.mtime = file_object.last_modified_date.timestamp()
+
+                if isinstance(file_object, Directory):
+                    member.type = tarfile.DIRTYPE
+                    member.mode = 0o755
+                    archive.addfile(member)
+                else:
+                    content = self.encode_content(file_object)
+                    member.size = len(content)
+                    member.mode = 0o644
+                    archive.addfile(member, io.BytesIO(content))
+
+                entries += 1
+
+        return entries
+
+
+    def save_zip(self, archive_path: str) -> int:
+        """
+        Saves the directory subtree as a zip archive.
+
+        Args:
+            archive_path (str): Archive path on the host filesystem.
+
+        Returns:
+            int: number of entries saved.
+        """
+
+        entries = 0
+
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for entry_name, file_object in self.walk():
+
+                date_time = file_object.last_modified_date.timetuple()[:6]
+
+                if isinstance(file_object, Directory):
+                    archive.writestr(zipfile.ZipInfo(entry_name + "/", date_time), b"")
+                else:
+                    member = zipfile.ZipInfo(entry_name, date_time)
+                    member.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(member, self.encode_content(file_object))
+
+                entries += 1
+
+        return entries
+
+
+    def walk(self):
+        """
+        Walks the directory subtree, parents before their childrens.
+
+        Yields:
+            tuple[str, Directory | File]: entry path relative to the directory, and its object.
+        """
+
+        # Entry path prefix of each directory, removed once its childrens are visited
+        prefixes = {self.directory: ""}
+
+        for directory in preorder(self.directory):
+            prefix = prefixes.pop(directory)
+
+            for file in directory.file_childrens:
+                yield prefix + file.name, file
+
+            for subdir in directory.directory_childrens:
+                yield prefix + subdir.name, subdir
+                prefixes[subdir] = prefix + subdir.name + "/"
+
+
+    def encode_content(self, file: File) -> bytes:
+        """
+        Encodes a file content to be written in an archive.
+
+        Args:
+            file (File): File to be encoded.
+
+        Returns:
+            bytes: encoded file content.
+        """
+
+        if file.content is None:
+            return b""
+
+        return file.content.encode(CONTENT_ENCODING, CONTENT_ERRORS)
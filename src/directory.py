@@ -1,65 +1,149 @@
 # External dependencies
 import datetime
+import gc
+import itertools
 
 # Internal dependencies
-from src.file import File
+from src.file import File, content_size
+from src.watcher import Event, Watcher
+from src.stats import stats
+from src.traversal import preorder
 
 class Directory:
     """
     Represents a directory.
     """
     
+    # Incremented when a directory is renamed or moved, invalidating every cached path
+    path_generation = 0
+    
     # Constructor ------------------------------------------------------------------------
     
-    def __init__(self, name: str, parent: "Directory" = None):
+    def __init__(self, name: str, parent: "Directory" = None, creation_date: datetime.datetime = None):
         """
         Args:
             name (str): Directory name
             parent (Directory, optional): Parent directory. Defaults to None.
+            creation_date (datetime, optional): Creation date. Defaults to now.
         """
         
         self.name = name
         self.directory_childrens: list["Directory"] = list()
         self.file_childrens: list[File] = list()
         self.parent = parent
+        self.watchers: list[Watcher] = list()
+        
+        self.cached_path: str = None
+        self.cached_path_generation = -1
         
-        self.creation_date = datetime.datetime.now()
+        # Entries and content bytes below this directory, and their limits
+        self.subtree_entries = 0
+        self.subtree_bytes = 0
+        self.entry_quota: int = None
+        self.byte_quota: int = None
+        
+        self.creation_date = creation_date if creation_date is not None else datetime.datetime.now()
         self.last_modified_date = self.creation_date
     
     
+    # Properties -----------------------------------------------------------------------
+    
+    @property
+    def path(self) -> str:
+        """
+        Absolute path, computed from the parent directories and cached until a directory is renamed or moved.
+        """
+        
+        generation = Directory.path_generation
+        
+        if self.cached_path_generation == generation:
+            return self.cached_path
+        
+        # Collecting the directories without a valid cached path
+        stale_directories = []
+        directory = self
+        
+        while directory is not None and directory.cached_path_generation != generation:
+            stale_directories.append(directory)
+            directory = directory.parent
+        
+        path = None if directory is None else directory.cached_path
+        
+        for directory in reversed(stale_directories):
+            path = "/" if path is None else path.rstrip("/") + "/" + directory.name
+            directory.cached_path = path
+            directory.cached_path_generation = generation
+        
+        return path
+    
+    
     # Methods --------------------------------------------------------------------------
     
-    def add_child_directory(self, child_directory: "Directory") -> None:
+    def add_child_directory(self, child_directory: "Directory") -> bool:
         """
         Add a new child directory.
 
         Args:
             child (Directory): A child directory.
+
+        Returns:
+            bool: True if it was added, False if the name exists or a quota would be exceeded.
         """
         
         if not isinstance(child_directory, Directory):
             print("Child directory must be an instance of Directory")
-            return
+            return False
+        
+        if self.check_directory_existence(child_directory.name):
+            return False
         
-        if not self.check_directory_existence(child_directory.name):
-            child_directory.parent = self
-            self.directory_childrens.append(child_directory)
+        entries, content_bytes = child_directory.usage()
+        if self.exceeds_quota(entries, content_bytes) is not None:
+            return False
+        
+        if child_directory.parent is not self:
+            Directory.path_generation += 1
+        child_directory.parent = self
+        self.directory_childrens.append(child_directory)
+        self.update_usage(entries, content_bytes)
+        self.notify(Event.CREATE, child_directory)
+        return True
     
     
-    def add_child_file(self, child_file: File) -> None:
+    def add_child_file(self, child_file: File, childrens: dict = None) -> bool:
         """
         Add a new child file.
 
         Args:
             child (File): A child file.
+            childrens (dict[str, Directory | File], optional): Childrens by name, from index_childrens, checked
+                instead of scanning the childrens and updated. Defaults to None.
+
+        Returns:
+            bool: True if it was added, False if the name exists or a quota would be exceeded.
         """
         
         if not isinstance(child_file, File):
             print("Child file must be an instance of File")
-            return
+            return False
         
-        if not self.check_file_existence(child_file.name):
-            self.file_childrens.append(child_file)
+        if childrens is None:
+            if self.check_file_existence(child_file.name):
+                return False
+        elif isinstance(childrens.get(child_file.name), File):
+            return False
+        
+        entries, content_bytes = child_file.usage()
+        if self.exceeds_quota(entries, content_bytes) is not None:
+            return False
+        
+        self.file_childrens.append(child_file)
+        self.update_usage(entries, content_bytes)
+        self.notify(Event.CREATE, child_file)
+        
+        if childrens is not None:
+            childrens.setdefault(child_file.name, child_file)
+        return True
     
             
     def check_existence(self, file_object_name: str):
@@ -76,13 +160,20 @@ class Directory:
         for directory in self.directory_childrens:
             
             if (directory.name == file_object_name):
+                if stats.enabled:
+                    stats.count_lookup(self.directory_childrens.index(directory) + 1)
                 return True
         
         for file in self.file_childrens:
             
             if (file.name == file_object_name):
+                if stats.enabled:
+                    stats.count_lookup(len(self.directory_childrens) + self.file_childrens.index(file) + 1)
                 return True
         
+        if stats.enabled:
+            stats.count_lookup(len(self.directory_childrens) + len(self.file_childrens))
+        
         return False
     
     def check_directory_existence(self, dir_name: str):
@@ -99,8 +190,13 @@ class Directory:
         for directory in self.directory_childrens:
             
             if (directory.name == dir_name):
+                if stats.enabled:
+                    stats.count_lookup(self.directory_childrens.index(directory) + 1)
                 return True
 
+        if stats.enabled:
+            stats.count_lookup(len(self.directory_childrens))
+        
         return False
     
     def check_file_existence(self, file_name: str):
@@ -117,8 +213,13 @@ class Directory:
         for file in self.file_childrens:
             
             if (file.name == file_name):
+                if stats.enabled:
+                    stats.count_lookup(self.file_childrens.index(file) + 1)
                 return True
         
+        if stats.enabled:
+            stats.count_lookup(len(self.file_childrens))
+        
         return False
 
     def find_file(self, file_object_name: str):
@@ -134,8 +235,13 @@ class Directory:
         
         for file in self.file_childrens:
             if (file.name == file_object_name):
+                if stats.enabled:
+                    stats.count_lookup(self.file_childrens.index(file) + 1)
                 return file
         
+        if stats.enabled:
+            stats.count_lookup(len(self.file_childrens))
+        
         return None
     
     def find_directory(self, dir_name: str):
@@ -151,8 +257,13 @@ class Directory:
         
         for directory in self.directory_childrens:
             if (directory.name == dir_name):
+                if stats.enabled:
+                    stats.count_lookup(self.directory_childrens.index(directory) + 1)
                 return directory
         
+        if stats.enabled:
+            stats.count_lookup(len(self.directory_childrens))
+        
         return None
 
     def find_objects(self, file_object_name: str):
@@ -165,6 +276,10 @@ class Directory:
         Returns:
             list[File | Directory]: file objects with same name
         """
+        
+        if stats.enabled:
+            stats.count_lookup(len(self.directory_childrens) + len(self.file_childrens))
+        
         objects = []
         
         for directory in self.directory_childrens:
@@ -201,6 +316,127 @@ class Directory:
         # If not found, return None
         return None
 
+    def make_directories(self, directory_names: list[str], indexes: dict = None):
+        """
+        Creates a chain of nested directories, like 'mkdir -p'. Directories that
+        already exist are reused, and '..' goes back to the previous directory.
+
+        Args:
+            directory_names (list[str]): Directory names, from the outermost to the innermost.
+            indexes (dict[Directory, dict], optional): Childrens by name of each directory, filled and kept up
+                to date, so repeated calls don't scan the same childrens again. Defaults to None.
+
+        Returns:
+            tuple[Directory, str]: the innermost directory and None, or None and why it couldn't be created:
+                a name is taken by a file, a quota would be exceeded or '..' goes above this directory.
+        """
+
+        # Directories walked through, '..' goes back along them
+        directories = [self]
+
+        for directory_name in directory_names:
+
+            # Skipping empty and current directory names
+            if directory_name in ("", "."):
+                continue
+
+            if directory_name == "..":
+                if len(directories) == 1:
+                    return None, "Outside the start directory"
+                directories.pop()
+                continue
+
+            directory = directories[-1]
+
+            if indexes is None:
+                child_directory = directory.find(directory_name)
+            else:
+                childrens = indexes.get(directory)
+                if childrens is None:
+                    childrens = directory.index_childrens()
+                    indexes[directory] = childrens
+                child_directory = childrens.get(directory_name)
+
+            if isinstance(child_directory, File):
+                return None, "Not a directory"
+
+            if child_directory is None:
+                if directory.exceeds_quota(1, 0) is not None:
+                    return None, "Disk quota exceeded"
+
+                child_directory = Directory(directory_name, directory)
+                directory.directory_childrens.append(child_directory)
+                directory.update_usage(1, 0)
+                directory.notify(Event.CREATE, child_directory)
+
+                if indexes is not None:
+                    indexes[directory][directory_name] = child_directory
+                    indexes[child_directory] = dict()
+
+            directories.append(child_directory)
+
+        return directories[-1], None
+
+    def bulk_load(self, paths, contents=None) -> int:
+        """
+        Creates many directories and files in one pass. Paths are sorted, so entries
+        of the same parent are created together, and every entry shares one creation date.
+        Existing children are indexed once per directory instead of scanned on each insert.
+
+        Args:
+            paths (Iterable[str]): Paths relative to this directory. Paths ending with '/' are directories,
+                missing parent directories are created.
+            contents (Iterable[str], optional): File contents, in the same order and number as the paths. Defaults to None.
+
+        Returns:
+            int: number of directories and files created. Entries over a quota are skipped.
+
+        Raises:
+            ValueError: if there are not as many contents as paths.
+        """
+        
+        creation_date = datetime.datetime.now()
+        
+        # Pairing each path with its content, a length mismatch raises ValueError
+        if contents is None:
+            entries = zip(paths, itertools.repeat(None))
+        else:
+            entries = zip(paths, contents, strict=True)
+        
+        # Paths with a common prefix are next to each other after sorting
+        entries = sorted(entries, key=lambda entry: entry[0])
+        
+        # Current chain of parent directories, with their children by name
+        loader = BulkLoader(self, creation_date)
+        
+        # The garbage collector would rescan the growing tree many times while it's being built
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        
+        try:
+            loader.load(entries)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        
+        if loader.rejected > 0:
+            print(f"bulk_load: {loader.rejected} entries skipped: Disk quota exceeded")
+        
+        return loader.created
+    
+    def index_childrens(self) -> dict:
+        """
+        Indexes the childrens by name.
+
+        Returns:
+            dict[str, Directory | File]: childrens by name.
+        """
+        
+        childrens = {file.name: file for file in self.file_childrens}
+        childrens.update((directory.name, directory) for directory in self.directory_childrens)
+        
+        return childrens
+
     def modify_name(self, new_name: str):
         """
         Changes current directory name.
@@ -210,8 +446,13 @@ class Directory:
         """
         
         if not self.check_existence(new_name):
+            old_name = self.name
             self.name = new_name
             self.last_modified_date = datetime.datetime.now()
+            Directory.path_generation += 1
+            
+            if self.parent is not None:
+                self.parent.notify(Event.RENAME, self, old_name=old_name)
             return True
 
         return False
@@ -229,6 +470,419 @@ class Directory:
                 self.directory_childrens.remove(file_object)
             else:
                 self.file_childrens.remove(file_object)
+            
+            entries, content_bytes = file_object.usage()
+            self.update_usage(-entries, -content_bytes)
+            self.notify(Event.DELETE, file_object)
+            
+            if isinstance(file_object, Directory) and Watcher.open_watchers > 0:
+                file_object.end_watchers()
+            
+            # Detaching it, so a leftover reference can't change the usage of this tree
+            file_object.parent = None
+            if isinstance(file_object, Directory):
+                Directory.path_generation += 1
             return True
         
         return False
+    
+    def move_child(self, file_object, destination: "Directory") -> bool:
+        """
+        Moves a child directory or file to another directory.
+
+        Args:
+            file_object (Directory | File): Child to be moved.
+            destination (Directory): New parent directory.
+
+        Returns:
+            bool: True if it was moved, False if the destination already has an object with the same name,
+                is inside the moved directory or a quota would be exceeded.
+        """
+        
+        if destination.check_existence(file_object.name):
+            return False
+        
+        if isinstance(file_object, Directory) and destination.common_ancestor(file_object) is file_object:
+            return False
+        
+        # Usage only changes below the closest common ancestor
+        ancestor = self.common_ancestor(destination)
+        entries, content_bytes = file_object.usage()
+        
+        if destination.exceeds_quota(entries, content_bytes, ancestor) is not None:
+            return False
+        
+        if (isinstance(file_object, Directory)):
+            self.directory_childrens.remove(file_object)
+            destination.directory_childrens.append(file_object)
+            Directory.path_generation += 1
+        else:
+            self.file_childrens.remove(file_object)
+            destination.file_childrens.append(file_object)
+        
+        file_object.parent = destination
+        
+        self.update_usage(-entries, -content_bytes, ancestor)
+        destination.update_usage(entries, content_bytes, ancestor)
+        
+        self.notify(Event.MOVE, file_object, old_directory=self)
+        destination.notify(Event.MOVE, file_object, old_directory=self)
+        return True
+    
+    def usage(self) -> tuple[int, int]:
+        """
+        Entries and content bytes this directory takes in the quota of its parents.
+
+        Returns:
+            tuple[int, int]: number of entries, counting itself, and content bytes.
+        """
+        
+        return 1 + self.subtree_entries, self.subtree_bytes
+    
+    def update_usage(self, entries: int, content_bytes: int, stop: "Directory" = None) -> None:
+        """
+        Adds entries and content bytes to this directory and its parents.
+
+        Args:
+            entries (int): Number of entries added, negative if removed.
+            content_bytes (int): Content bytes added, negative if removed.
+            stop (Directory, optional): Ancestor where the update stops, not included. Defaults to None.
+        """
+        
+        directory = self
+        
+        while directory is not stop:
+            directory.subtree_entries += entries
+            directory.subtree_bytes += content_bytes
+            directory = directory.parent
+    
+    def exceeds_quota(self, entries: int, content_bytes: int, stop: "Directory" = None):
+        """
+        Checks if adding entries and content bytes to this directory would exceed its quota, or one of its parents'.
+
+        Args:
+            entries (int): Number of entries to be added.
+            content_bytes (int): Content bytes to be added.
+            stop (Directory, optional): Ancestor where the check stops, not included. Defaults to None.
+
+        Returns:
+            Directory: the first directory whose quota would be exceeded, or None.
+        """
+        
+        directory = self
+        
+        while directory is not stop:
+            if entries > 0 and directory.entry_quota is not None and directory.subtree_entries + entries > directory.entry_quota:
+                return directory
+            
+            if content_bytes > 0 and directory.byte_quota is not None and directory.subtree_bytes + content_bytes > directory.byte_quota:
+                return directory
+            
+            directory = directory.parent
+        
+        return None
+    
+    def common_ancestor(self, other: "Directory"):
+        """
+        Finds the closest directory that contains both directories.
+
+        Args:
+            other (Directory): Other directory.
+
+        Returns:
+            Directory: the closest common ancestor, or None if they are in different trees.
+        """
+        
+        ancestors = set()
+        directory = self
+        
+        while directory is not None:
+            ancestors.add(directory)
+            directory = directory.parent
+        
+        directory = other
+        
+        while directory is not None and directory not in ancestors:
+            directory = directory.parent
+        
+        return directory
+    
+    def end_watchers(self) -> None:
+        """
+        Ends the watchers of this removed directory and of its subdirectories, telling each one its directory was deleted.
+        """
+        
+        for directory in preorder(self):
+            for watcher in list(directory.watchers):
+                watcher.end(Event(Event.DELETE, directory.parent, directory))
+    
+    def notify(self, kind: str, file_object, old_name: str = None, old_directory: "Directory" = None) -> None:
+        """
+        Queues a change event for the watchers of this directory and the recursive watchers of its ancestors.
+
+        Args:
+            kind (str): Event kind, one of the Event constants.
+            file_object (Directory | File): Changed directory or file.
+            old_name (str, optional): Previous name, for rename events. Defaults to None.
+            old_directory (Directory, optional): Previous parent, for move events. Defaults to None.
+        """
+        
+        if Watcher.open_watchers == 0:
+            return
+        
+        event = None
+        directory = self
+        
+        while directory is not None:
+            for watcher in directory.watchers:
+                if watcher.recursive or directory is self:
+                    if event is None:
+                        event = Event(kind, self, file_object, old_name, old_directory)
+                    watcher.push(event)
+            
+            directory = directory.parent
+
+
+
+class BulkLoader:
+    """
+    Chain of directories being filled by Directory.bulk_load.
+    Usage is added up per directory of the chain and applied once the loader leaves it,
+    and quotas are checked against the remaining space of the chain, so each entry costs O(1).
+    """
+    
+    # Constructor ------------------------------------------------------------------------
+    
+    def __init__(self, root: Directory, creation_date: datetime.datetime):
+        """
+        Args:
+            root (Directory): Directory the paths are relative to.
+            creation_date (datetime): Creation date of the new directories.
+        """
+        
+        self.creation_date = creation_date
+        self.created = 0
+        self.created_bytes = 0
+        self.rejected = 0
+        
+        self.directories: list[Directory] = [root]
+        self.directory_names: list[str] = []
+        self.childrens: list[dict] = [root.index_childrens()]
+        
+        # Usage added below each directory of the chain, not applied yet
+        self.pending_entries: list[int] = [0]
+        self.pending_bytes: list[int] = [0]
+        
+        # Totals of self.created and self.created_bytes allowed by the quotas of the chain
+        entry_limit = float("inf")
+        byte_limit = float("inf")
+        
+        directory = root
+        while directory is not None:
+            if directory.entry_quota is not None:
+                entry_limit = min(entry_limit, directory.entry_quota - directory.subtree_entries)
+            if directory.byte_quota is not None:
+                byte_limit = min(byte_limit, directory.byte_quota - directory.subtree_bytes)
+            directory = directory.parent
+        
+        self.entry_limits: list[float] = [entry_limit]
+        self.byte_limits: list[float] = [byte_limit]
+        
+        # Directory new files go into, None if the path can't be created
+        self.parent: Directory = root
+    
+    # Methods --------------------------------------------------------------------------
+    
+    def load(self, entries: list[tuple]) -> None:
+        """
+        Creates the directories and files of sorted entries.
+
+        Args:
+            entries (list[tuple[str, str]]): Sorted paths and contents.
+        """
+        
+        last_path = None
+        last_parent_path = None
+        
+        for path, content in entries:
+            
+            # Skipping repeated paths
+            if path == last_path:
+                continue
+            last_path = path
+            
+            parent_path, _, file_name = path.rpartition("/")
+            
+            if parent_path != last_parent_path:
+                self.go_to(parent_path)
+                last_parent_path = parent_path
+            
+            # Directories were created by go_to, entries that would escape the directory are refused
+            if self.parent is None or file_name in ("", ".", ".."):
+                continue
+            
+            childrens = self.childrens[-1]
+            child = childrens.get(file_name)
+            
+            if child is None:
+                size = content_size(content)
+                if not self.fits(1, size):
+                    continue
+                
+                child = File(self.parent, file_name, content, self.creation_date)
+                self.parent.file_childrens.append(child)
+                self.add_usage(1, size)
+                self.parent.notify(Event.CREATE, child)
+                childrens[file_name] = child
+            
+            elif isinstance(child, File) and content is not None:
+                size = content_size(content)
+                if not self.fits(0, size - child.size):
+                    continue
+                
+                self.add_usage(0, size - child.size)
+                child.content = content
+                child.size = size
+                child.last_modified_date = self.creation_date
+                self.parent.notify(Event.MODIFY, child)
+        
+        # Applying the usage of the whole chain
+        self.go_back_to(0)
+        self.directories[0].update_usage(self.pending_entries[0], self.pending_bytes[0])
+    
+    
+    def go_to(self, path: str) -> None:
+        """
+        Moves to a directory, creating it and its missing parents.
+
+        Args:
+            path (str): Directory path, relative to the root directory.
+        """
+        
+        names = [name for name in path.split("/") if name not in ("", ".")]
+        
+        if ".." in names:
+            self.parent = None
+            return
+        
+        # Going back to the common ancestor
+        depth = 0
+        while depth < len(self.directory_names) and depth < len(names) and self.directory_names[depth] == names[depth]:
+            depth += 1
+        
+        self.go_back_to(depth)
+        
+        # Going forward, creating the missing directories
+        for directory_name in names[depth:]:
+            parent = self.directories[-1]
+            child = self.childrens[-1].get(directory_name)
+            
+            if child is None:
+                if not self.fits(1, 0):
+                    self.parent = None
+                    return
+                
+                child = Directory(directory_name, parent, self.creation_date)
+                parent.directory_childrens.append(child)
+                self.add_usage(1, 0)
+                parent.notify(Event.CREATE, child)
+                self.childrens[-1][directory_name] = child
+                self.push(child, dict())
+            
+            elif isinstance(child, Directory):
+                self.push(child, child.index_childrens())
+            
+            # A file is taking the name of a directory
+            else:
+                self.parent = None
+                return
+        
+        self.parent = self.directories[-1]
+    
+    
+    def push(self, directory: Directory, childrens: dict) -> None:
+        """
+        Adds a directory to the end of the chain.
+
+        Args:
+            directory (Directory): Child of the last directory of the chain.
+            childrens (dict[str, Directory | File]): Its childrens by name.
+        """
+        
+        entry_limit = self.entry_limits[-1]
+        if directory.entry_quota is not None:
+            entry_limit = min(entry_limit, self.created + directory.entry_quota - directory.subtree_entries)
+        
+        byte_limit = self.byte_limits[-1]
+        if directory.byte_quota is not None:
+            byte_limit = min(byte_limit, self.created_bytes + directory.byte_quota - directory.subtree_bytes)
+        
+        self.directories.append(directory)
+        self.directory_names.append(directory.name)
+        self.childrens.append(childrens)
+        self.pending_entries.append(0)
+        self.pending_bytes.append(0)
+        self.entry_limits.append(entry_limit)
+        self.byte_limits.append(byte_limit)
+    
+    
+    def go_back_to(self, depth: int) -> None:
+        """
+        Removes directories from the end of the chain, applying their usage.
+
+        Args:
+            depth (int): Number of directories kept after the root directory.
+        """
+        
+        while len(self.directories) > depth + 1:
+            directory = self.directories.pop()
+            entries = self.pending_entries.pop()
+            content_bytes = self.pending_bytes.pop()
+            
+            directory.subtree_entries += entries
+            directory.subtree_bytes += content_bytes
+            self.pending_entries[-1] += entries
+            self.pending_bytes[-1] += content_bytes
+            
+            self.directory_names.pop()
+            self.childrens.pop()
+            self.entry_limits.pop()
+            self.byte_limits.pop()
+    
+    
+    def fits(self, entries: int, content_bytes: int) -> bool:
+        """
+        Checks the quotas of the chain before adding an entry to its last directory.
+
+        Args:
+            entries (int): Number of entries to be added.
+            content_bytes (int): Content bytes to be added.
+
+        Returns:
+            bool: True if they fit, False if the entry was rejected.
+        """
+        
+        if entries > 0 and self.created + entries > self.entry_limits[-1]:
+            self.rejected += 1
+            return False
+        
+        if content_bytes > 0 and self.created_bytes + content_bytes > self.byte_limits[-1]:
+            self.rejected += 1
+            return False
+        
+        return True
+    
+    
+    def add_usage(self, entries: int, content_bytes: int) -> None:
+        """
+        Adds an entry usage to the last directory of the chain.
+
+        Args:
+            entries (int): Number of entries added.
+            content_bytes (int): Content bytes added.
+        """
+        
+        self.created += entries
+        self.created_bytes += content_bytes
+        self.pending_entries[-1] += entries
+        self.pending_bytes[-1] += content_bytes
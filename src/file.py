@@ -1,6 +1,29 @@
 # External dependencies
 import datetime
 
+# Internal dependencies
+from src.watcher import Event
+
+def content_size(content: str) -> int:
+    """
+    Measures a file content.
+
+    Args:
+        content (str): File content, or None.
+
+    Returns:
+        int: content size in bytes, encoded as UTF-8.
+    """
+    
+    if content is None:
+        return 0
+    
+    if content.isascii():
+        return len(content)
+    
+    return len(content.encode("utf-8", "surrogateescape"))
+
+
 class File:
     """
     Represents a file.
@@ -8,31 +31,73 @@ class File:
     
     # Constructor ---------------------------------------------------------------
     
-    def __init__(self, parent, name: str, content: str = None):
+    def __init__(self, parent, name: str, content: str = None, creation_date: datetime.datetime = None):
         """
         Args:
             name (str): File name.
             parent (Directory): Parent directory. Defaults to None.
+            content (str, optional): File content. Defaults to None.
+            creation_date (datetime, optional): Creation date. Defaults to now.
         """
         
         self.name = name
         self.content = content
+        self.size = content_size(content)
         self.parent = parent
         
-        self.creation_date = datetime.datetime.now()
+        self.creation_date = creation_date if creation_date is not None else datetime.datetime.now()
         self.last_modified_date = self.creation_date
     
+    # Properties --------------------------------------------------------------
+    
+    @property
+    def path(self) -> str:
+        """
+        Absolute path, from the cached path of the parent directory.
+        """
+        
+        if self.parent is None:
+            return "/" + self.name
+        
+        return self.parent.path.rstrip("/") + "/" + self.name
+    
     # Methods -------------------------------------------------------------------
     
-    def update_content(self, content: str) -> None:
+    def usage(self) -> tuple[int, int]:
+        """
+        Entries and content bytes this file takes in the quota of its parents.
+
+        Returns:
+            tuple[int, int]: number of entries and content bytes.
+        """
+        
+        return 1, self.size
+    
+    def update_content(self, content: str) -> bool:
         """
         Updates the current file content.
 
         Args:
             content (str): New content string.
+
+        Returns:
+            bool: True if it was updated, False if it would exceed a byte quota.
         """
+        size = content_size(content)
+        
+        if self.parent is not None:
+            if self.parent.exceeds_quota(0, size - self.size) is not None:
+                return False
+            self.parent.update_usage(0, size - self.size)
+        
         self.content = content
+        self.size = size
         self.last_modified_date = datetime.datetime.now()
+        
+        if self.parent is not None:
+            self.parent.notify(Event.MODIFY, self)
+        
+        return True
     
     def modify_name(self, new_name: str):
         """
@@ -43,8 +108,10 @@ class File:
         """
         
         if not self.parent.check_file_existence(new_name):
+            old_name = self.name
             self.name = new_name
             self.last_modified_date = datetime.datetime.now()
+            self.parent.notify(Event.RENAME, self, old_name=old_name)
             return True
         
         return False
\ No newline at end of file
@@ -1,6 +1,7 @@
 # Internal dependencies
 from src.file import File
 from src.directory import Directory
+from src.traversal import preorder
 
 # External dependencies
 import matplotlib.pyplot as plt
@@ -19,14 +20,14 @@ class Interface:
             root_directory (Directory): The root directory of the sub-tree
             graph (nx.DiGraph): Graph representing the directory tree.
         """
-        for file in root.file_childrens:
-            graph.add_node(file.name, type='file')  # Adicionando atributo 'type' para identificar arquivos
-            graph.add_edge(root.name, file.name)
-        
-        for subdir in root.directory_childrens:
-            graph.add_node(subdir.name, type='directory')  # Adicionando atributo 'type' para identificar diretórios
-            self.make_tree(subdir, graph)
-            graph.add_edge(root.name, subdir.name)
+        for directory in preorder(root):
+            for file in directory.file_childrens:
+                graph.add_node(file.name, type='file')  # Adicionando atributo 'type' para identificar arquivos
+                graph.add_edge(directory.name, file.name)
+            
+            for subdir in directory.directory_childrens:
+                graph.add_node(subdir.name, type='directory')  # Adicionando atributo 'type' para identificar diretórios
+                graph.add_edge(directory.name, subdir.name)
         
     def create_graph(self):
         """
@@ -0,0 +1,836 @@
+# External dependencies
+import collections
+import contextlib
+import functools
+import io
+import multiprocessing
+import zlib
+
+# Internal dependencies
+from src.file import File
+from src.directory import Directory
+from src.terminal import Terminal
+from src.archive import Archive
+
+# Replies each shard may owe before the front-end stops sending and waits
+PIPELINE_WINDOW = 64
+
+
+def shard_of(name: str, shards: int) -> int:
+    """
+    Chooses the shard of a top level directory or file.
+
+    Args:
+        name (str): Top level name.
+        shards (int): Number of shards.
+
+    Returns:
+        int: shard index.
+    """
+
+    return zlib.crc32(name.encode("utf-8", "surrogateescape")) % shards
+
+
+def normalize_path(path: str, current_path: str):
+    """
+    Turns a path into an absolute path without '.' and '..'.
+
+    Args:
+        path (str): Absolute path, or relative to the current path.
+        current_path (str): Absolute current path.
+
+    Returns:
+        list[str]: directory names from the root, or None if the path goes above the root.
+    """
+
+    names = [] if path.startswith("/") else [name for name in current_path.split("/") if name]
+
+    for name in path.split("/"):
+
+        if name in ("", "."):
+            continue
+
+        if name == "..":
+            if len(names) == 0:
+                return None
+            names.pop()
+        else:
+            names.append(name)
+
+    return names
+
+
+def run_shard(connection) -> None:
+    """
+    Shard process entry point, answers the front-end requests until it asks to stop.
+
+    Args:
+        connection (Connection): Pipe to the front-end.
+    """
+
+    worker = ShardWorker()
+
+    while True:
+        request = connection.recv()
+
+        if request[0] == "stop":
+            connection.close()
+            return
+
+        connection.send(worker.handle(request))
+
+
+class ShardWorker:
+    """
+    Holds the top level subtrees of one shard, and runs the commands routed to it.
+    """
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self) -> None:
+
+        self.terminal = Terminal(Directory("root"))
+
+        # Transfers between prepare and commit, by transaction id
+        self.transfers: dict[int, tuple] = dict()
+
+    # Methods --------------------------------------------------------------------------
+
+    def handle(self, request: tuple):
+        """
+        Runs a front-end request.
+
+        Args:
+            request (tuple): Request name followed by its arguments.
+
+        Returns:
+            Any: the request reply.
+        """
+
+        return getattr(self, "request_" + request[0])(*request[1:])
+
+
+    def request_command(self, command_line: str, current_path: str) -> str:
+        """
+        Runs a terminal command from a directory.
+
+        Args:
+            command_line (str): Command, as typed by the user.
+            current_path (str): Directory the command runs from.
+
+        Returns:
+            str: the command output.
+        """
+
+        directory = self.terminal.resolve_directory(current_path)
+        if directory is None:
+            return f"{command_line.split(' ')[0]}: no such directory: {current_path}\n"
+
+        self.terminal.current_directory = directory
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.terminal.interpret_command(command_line)
+
+        return output.getvalue()
+
+
+    def request_resolve(self, path: str) -> str:
+        """
+        Tells what a path is.
+
+        Args:
+            path (str): Absolute path.
+
+        Returns:
+            str: 'directory', 'file', or None if it doesn't exist.
+        """
+
+        parent_path, _, name = path.rstrip("/").rpartition("/")
+
+        parent = self.terminal.resolve_directory(parent_path + "/")
+        if parent is None:
+            return None
+
+        file_object = parent.find(name) if name else parent
+
+        if isinstance(file_object, Directory):
+            return "directory"
+
+        if isinstance(file_object, File):
+            return "file"
+
+        return None
+
+
+    def request_list(self, path: str) -> list[tuple[str, bool]]:
+        """
+        Lists a directory.
+
+        Args:
+            path (str): Absolute directory path.
+
+        Returns:
+            list[tuple[str, bool]]: children names, and whether each one is a directory.
+        """
+
+        directory = self.terminal.resolve_directory(path)
+        if directory is None:
+            return []
+
+        return self.terminal.list_directory(directory)
+
+
+    def request_find(self, path: str, pattern: str) -> list[str]:
+        """
+        Finds the paths below a directory whose name matches a pattern.
+
+        Args:
+            path (str): Absolute directory path.
+            pattern (str): Shell style name pattern.
+
+        Returns:
+            list[str]: sorted absolute paths.
+        """
+
+        directory = self.terminal.resolve_directory(path)
+        if directory is None:
+            return []
+
+        return self.terminal.find_paths(directory, pattern)
+
+
+    def request_du(self, path: str) -> tuple[int, int]:
+        """
+        Measures a directory.
+
+        Args:
+            path (str): Absolute directory path.
+
+        Returns:
+            tuple[int, int]: entries and content bytes below the directory.
+        """
+
+        directory = self.terminal.resolve_directory(path)
+        if directory is None:
+            return 0, 0
+
+        return directory.subtree_entries, directory.subtree_bytes
+
+
+    def request_prepare_send(self, transfer_id: int, path: str) -> tuple[bool, dict]:
+        """
+        First phase of a transfer on the source shard: serializes a directory or file.
+
+        Args:
+            transfer_id (int): Transfer id.
+            path (str): Absolute path of the transferred object.
+
+        Returns:
+            tuple[bool, dict]: True and the serialized object, or False and an error message.
+        """
+
+        parent_path, _, name = path.rstrip("/").rpartition("/")
+
+        parent = self.terminal.resolve_directory(parent_path + "/")
+        file_object = parent.find(name) if parent is not None and name else None
+
+        if file_object is None:
+            return False, f"'{path}' not found"
+
+        # Dates and quotas by path relative to the object, '' being the object itself
+        attributes = {"": self.attributes_of(file_object)}
+
+        if isinstance(file_object, File):
+            payload = {"directory": False, "content": file_object.content}
+        else:
+            paths = []
+            contents = []
+
+            for entry_name, entry in Archive(file_object).walk():
+                if isinstance(entry, Directory):
+                    paths.append(entry_name + "/")
+                    contents.append(None)
+                else:
+                    paths.append(entry_name)
+                    contents.append(entry.content)
+
+                attributes[entry_name] = self.attributes_of(entry)
+
+            payload = {"directory": True, "paths": paths, "contents": contents}
+
+        payload["attributes"] = attributes
+        payload["entries"], payload["bytes"] = file_object.usage()
+
+        self.transfers[transfer_id] = ("send", parent, file_object)
+        return True, payload
+
+
+    def request_prepare_receive(self, transfer_id: int, path: str, name: str, payload: dict) -> tuple[bool, str]:
+        """
+        First phase of a transfer on the destination shard: checks the object can be created.
+
+        Args:
+            transfer_id (int): Transfer id.
+            path (str): Absolute path of the destination directory.
+            name (str): Name of the object in the destination directory.
+            payload (dict): Object serialized by request_prepare_send.
+
+        Returns:
+            tuple[bool, str]: True, or False and an error message.
+        """
+
+        directory = self.terminal.resolve_directory(path)
+
+        if directory is None:
+            return False, f"'{path}' is not a directory"
+
+        if directory.check_existence(name):
+            return False, f"'{name}' already exists"
+
+        if directory.exceeds_quota(payload["entries"], payload["bytes"]) is not None:
+            return False, "Disk quota exceeded"
+
+        self.transfers[transfer_id] = ("receive", directory, name, payload)
+        return True, None
+
+
+    def request_commit(self, transfer_id: int) -> bool:
+        """
+        Second phase of a transfer: creates the object on the destination shard, or removes it on the source shard.
+
+        Args:
+            transfer_id (int): Transfer id.
+
+        Returns:
+            bool: True if it was applied, False if the transfer is unknown.
+        """
+
+        transfer = self.transfers.pop(transfer_id, None)
+        if transfer is None:
+            return False
+
+        if transfer[0] == "send":
+            _, parent, file_object = transfer
+            return parent.remove_child(file_object)
+
+        _, directory, name, payload = transfer
+        attributes = payload["attributes"]
+
+        if not payload["directory"]:
+            file = File(directory, name, payload["content"])
+            if not directory.add_child_file(file):
+                return False
+
+            self.restore_attributes(file, attributes[""])
+            return True
+
+        child_directory = Directory(name, directory)
+        if not directory.add_child_directory(child_directory):
+            return False
+
+        child_directory.bulk_load(payload["paths"], payload["contents"])
+
+        # Quotas are restored once the subtree is loaded, it already fitted them on the source shard
+        self.restore_attributes(child_directory, attributes[""])
+        for entry_name, entry in Archive(child_directory).walk():
+            self.restore_attributes(entry, attributes[entry_name])
+
+        return True
+
+
+    def attributes_of(self, file_object) -> tuple:
+        """
+        Collects what a transfer keeps besides the names and contents.
+
+        Args:
+            file_object (Directory | File): Transferred directory or file.
+
+        Returns:
+            tuple: creation date, last modified date, entry quota and byte quota, None for files.
+        """
+
+        if isinstance(file_object, Directory):
+            return file_object.creation_date, file_object.last_modified_date, file_object.entry_quota, file_object.byte_quota
+
+        return file_object.creation_date, file_object.last_modified_date, None, None
+
+
+    def restore_attributes(self, file_object, attributes: tuple) -> None:
+        """
+        Applies the attributes collected by attributes_of to a transferred directory or file.
+
+        Args:
+            file_object (Directory | File): Created directory or file.
+            attributes (tuple): Creation date, last modified date, entry quota and byte quota.
+        """
+
+        file_object.creation_date, file_object.last_modified_date, entry_quota, byte_quota = attributes
+
+        if isinstance(file_object, Directory):
+            file_object.entry_quota = entry_quota
+            file_object.byte_quota = byte_quota
+
+
+    def request_abort(self, transfer_id: int) -> bool:
+        """
+        Drops a prepared transfer.
+
+        Args:
+            transfer_id (int): Transfer id.
+
+        Returns:
+            bool: True if it was prepared, False if not.
+        """
+
+        return self.transfers.pop(transfer_id, None) is not None
+
+
+class ShardedTerminal(Terminal):
+    """
+    Terminal whose top level directories and files are spread over worker processes.
+    Commands are routed to the shard owning the top level name of their path, and
+    'ls', 'find' and 'du' on the root directory merge the results of every shard.
+    """
+
+    # Commands that run on the shard owning their path
+    ROUTED_COMMANDS = ("ls", "mkdir", "touch", "rm", "nano", "cat", "quota", "import", "export", "find", "du")
+
+    # Commands that need the whole tree in one process
+    UNSUPPORTED_COMMANDS = ("interface", "watch", "unwatch", "stats")
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self, shards: int) -> None:
+        """
+        Args:
+            shards (int): Number of worker processes.
+        """
+
+        super().__init__(Directory("root"))
+
+        self.current_path = "/"
+        self.last_path = "/"
+        self.transfer_count = 0
+
+        self.connections = []
+        self.processes = []
+
+        for _ in range(shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_shard, args=(worker_connection,), daemon=True)
+            process.start()
+
+            self.connections.append(connection)
+            self.processes.append(process)
+
+        for command in ShardedTerminal.ROUTED_COMMANDS:
+            self.commands[command] = functools.partial(self.command_routed, command)
+
+        for command in ShardedTerminal.UNSUPPORTED_COMMANDS:
+            self.commands[command] = functools.partial(self.command_unsupported, command)
+
+    # Properties -----------------------------------------------------------------------
+
+    @property
+    def path(self) -> str:
+        """
+        Absolute path of the current directory.
+        """
+
+        return self.current_path
+
+    # Command functions --------------------------------------------------------------
+
+    def command_routed(self, command: str, terminal_input: list[str]):
+        """
+        Runs a command on the shards owning its paths, or merges the shards results on the root directory.
+
+        Args:
+            command (str): command name
+            terminal_input (list[str]): commands from user input
+        """
+
+        requests = self.route(command, terminal_input)
+
+        if requests is not None:
+            for shard, command_line, path in requests:
+                print(self.request(shard, ("command", command_line, path)), end="")
+            return
+
+        if command == "ls":
+            file_objects = []
+            for shard in range(len(self.connections)):
+                file_objects += self.request(shard, ("list", "/"))
+            self.print_listing(file_objects)
+
+        elif command == "find":
+            paths = []
+            for shard in range(len(self.connections)):
+                paths += self.request(shard, ("find", "/", terminal_input[-1]))
+            for path in sorted(paths):
+                print(path)
+
+        elif command == "du":
+            entries = 0
+            content_bytes = 0
+            for shard in range(len(self.connections)):
+                shard_entries, shard_bytes = self.request(shard, ("du", "/"))
+                entries += shard_entries
+                content_bytes += shard_bytes
+            self.print_usage(entries, content_bytes, "/")
+
+        else:
+            print(f"{command}: not supported on the root directory in sharded mode")
+
+
+    def command_unsupported(self, command: str, terminal_input: list[str]):
+        """
+        Rejects commands that need the whole tree in one process.
+
+        Args:
+            command (str): command name
+            terminal_input (list[str]): commands from user input
+        """
+
+        print(f"{command}: not supported in sharded mode")
+
+
+    def command_cd(self, terminal_input: list[str]):
+        """
+        Simulates 'cd' terminal command, checking the target on its shard.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+
+        if (len(terminal_input) > 1):
+            print(f"cd: invalid arguments")
+            return
+
+        elif (len(terminal_input) == 0):
+            self.change_path_to("/")
+            return
+
+        # The last directory is checked like any other target, it may have been removed since
+        path = self.last_path if terminal_input[0] == "-" else terminal_input[0]
+        names = normalize_path(path, self.current_path)
+
+        if names is None:
+            print(f"cd: Cannot access any folders prior to the root directory")
+            return
+
+        if len(names) == 0:
+            self.change_path_to("/")
+            return
+
+        path = "/" + "/".join(names)
+        kind = self.request(shard_of(names[0], len(self.connections)), ("resolve", path))
+
+        if kind == "directory":
+            self.change_path_to(path)
+        elif kind == "file":
+            print(f"cd: not a directory: {terminal_input[0]}")
+        else:
+            print(f"cd: no such file or directory: {terminal_input[0]}")
+
+
+    def command_mv(self, terminal_input: list[str]):
+        """
+        Moves a file or directory, with a two-phase transfer when it changes shard.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+
+        if len(terminal_input) != 2 or self.current_path != "/":
+            self.forward("mv", terminal_input)
+            return
+
+        source_name, destination_name = terminal_input
+        source_shard = shard_of(source_name, len(self.connections))
+        destination_shard = shard_of(destination_name, len(self.connections))
+
+        if source_shard == destination_shard:
+            self.forward("mv", terminal_input)
+            return
+
+        if self.request(source_shard, ("resolve", "/" + source_name)) is None:
+            print(f"O objeto '{source_name}' não foi encontrado!")
+            return
+
+        if self.request(destination_shard, ("resolve", "/" + destination_name)) != "directory":
+            print(f"O destino '{destination_name}' não é um diretório válido!")
+            return
+
+        error = self.transfer(source_shard, "/" + source_name, destination_shard, "/" + destination_name, source_name)
+        if error is not None:
+            print(f"mv: cannot move '{source_name}': {error}")
+
+
+    def command_rename(self, terminal_input: list[str]):
+        """
+        Renames a file or directory, with a two-phase transfer when the new name belongs to another shard.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+
+        if len(terminal_input) != 2 or self.current_path != "/":
+            self.forward("rename", terminal_input)
+            return
+
+        current_name, new_name = terminal_input
+        source_shard = shard_of(current_name, len(self.connections))
+        destination_shard = shard_of(new_name, len(self.connections))
+
+        if source_shard == destination_shard:
+            self.forward("rename", terminal_input)
+            return
+
+        if self.request(source_shard, ("resolve", "/" + current_name)) is None:
+            print(f"Object '{current_name}' not found!")
+            return
+
+        if self.request(destination_shard, ("resolve", "/" + new_name)) is not None:
+            print(f"You can't rename to '{new_name}'. File or directory already exists!")
+            return
+
+        error = self.transfer(source_shard, "/" + current_name, destination_shard, "/", new_name)
+        if error is not None:
+            print(f"rename: cannot rename '{current_name}': {error}")
+
+    # Utilitary functions --------------------------------------------------------------
+
+    def route(self, command: str, terminal_input: list[str]):
+        """
+        Finds the shards a command runs on. Path arguments are made absolute and run from
+        the root directory, names of the current directory run from the current directory.
+
+        Args:
+            command (str): command name
+            terminal_input (list[str]): commands from user input
+
+        Returns:
+            list[tuple[int, str, str]]: shards, the command line each one runs and the directory it
+                runs from, or None if the command targets the root directory itself.
+        """
+
+        command_line = " ".join([command] + terminal_input)
+
+        # Shard of the current directory, None on the root directory
+        current_names = normalize_path(self.current_path, "/")
+        current_shard = shard_of(current_names[0], len(self.connections)) if current_names else None
+
+        # Invalid arguments are reported by any shard
+        fallback = [(current_shard or 0, command_line, self.current_path)]
+
+        if command in ("mkdir", "touch", "rm"):
+            options = [argument for argument in terminal_input if argument.startswith("-")]
+            make_parents = command == "mkdir" and "-p" in options
+            groups: dict[int, list[str]] = dict()
+
+            for argument in terminal_input:
+                if argument.startswith("-"):
+                    continue
+
+                if make_parents:
+                    names = normalize_path(argument, self.current_path)
+                    if not names:
+                        return fallback
+                    shard = shard_of(names[0], len(self.connections))
+                    argument = "/" + "/".join(names)
+                elif current_shard is not None:
+                    shard = current_shard
+                else:
+                    shard = shard_of(argument, len(self.connections))
+
+                groups.setdefault(shard, []).append(argument)
+
+            if len(groups) == 0:
+                return fallback
+
+            # Paths were made absolute, names are still relative to the current directory
+            path = "/" if make_parents else self.current_path
+            return [(shard, " ".join([command] + options + arguments), path) for shard, arguments in groups.items()]
+
+        if command in ("nano", "cat"):
+            if current_shard is not None:
+                return [(current_shard, command_line, self.current_path)]
+            if len(terminal_input) == 0:
+                return fallback
+            return [(shard_of(terminal_input[0], len(self.connections)), command_line, "/")]
+
+        # Position of the directory argument, the current directory is used without it
+        if command in ("quota", "import", "export"):
+            position = 1 if len(terminal_input) > 1 else None
+        elif command == "find":
+            if len(terminal_input) not in (1, 2):
+                return fallback
+            position = 0 if len(terminal_input) == 2 else None
+        elif command == "du":
+            if len(terminal_input) > 1:
+                return fallback
+            position = 0 if len(terminal_input) == 1 else None
+        else:
+            position = None
+
+        if position is None:
+            if current_shard is None:
+                return None
+            return [(current_shard, command_line, self.current_path)]
+
+        names = normalize_path(terminal_input[position], self.current_path)
+
+        if names is None:
+            return fallback
+
+        if len(names) == 0:
+            return None
+
+        arguments = list(terminal_input)
+        arguments[position] = "/" + "/".join(names)
+
+        return [(shard_of(names[0], len(self.connections)), " ".join([command] + arguments), "/")]
+
+
+    def forward(self, command: str, terminal_input: list[str]):
+        """
+        Runs a command on the shard of the current directory, or of its first argument on the root directory.
+
+        Args:
+            command (str): command name
+            terminal_input (list[str]): commands from user input
+        """
+
+        names = normalize_path(self.current_path, "/")
+        if not names:
+            names = normalize_path(terminal_input[0], "/") if terminal_input else []
+
+        shard = shard_of(names[0], len(self.connections)) if names else 0
+        print(self.request(shard, ("command", " ".join([command] + terminal_input), self.current_path)), end="")
+
+
+    def transfer(self, source_shard: int, source_path: str, destination_shard: int, destination_path: str, name: str):
+        """
+        Moves a directory or file between shards in two phases: both shards prepare, then
+        the destination creates it and the source removes it. If a shard refuses, both abort.
+
+        Args:
+            source_shard (int): Shard holding the object.
+            source_path (str): Absolute path of the object.
+            destination_shard (int): Shard receiving the object.
+            destination_path (str): Absolute path of the destination directory.
+            name (str): Name of the object in the destination directory.
+
+        Returns:
+            str: an error message, or None if it was moved.
+        """
+
+        self.transfer_count += 1
+        transfer_id = self.transfer_count
+
+        ready, payload = self.request(source_shard, ("prepare_send", transfer_id, source_path))
+        if not ready:
+            return payload
+
+        ready, error = self.request(destination_shard, ("prepare_receive", transfer_id, destination_path, name, payload))
+        if not ready:
+            self.request(source_shard, ("abort", transfer_id))
+            return error
+
+        # Creating before removing, the source keeps the object unless the destination created it
+        if not self.request(destination_shard, ("commit", transfer_id)):
+            self.request(source_shard, ("abort", transfer_id))
+            return f"cannot create '{name}' in '{destination_path}'"
+
+        self.request(source_shard, ("commit", transfer_id))
+        return None
+
+
+    def request(self, shard: int, request: tuple):
+        """
+        Sends a request to a shard and waits for its reply.
+
+        Args:
+            shard (int): Shard index.
+            request (tuple): Request name followed by its arguments.
+
+        Returns:
+            Any: the shard reply.
+        """
+
+        self.connections[shard].send(request)
+        return self.connections[shard].recv()
+
+
+    def interpret_commands(self, terminal_inputs: list[str]):
+        """
+        Processes many commands, sending the routed ones to their shards without waiting
+        for each reply, so the shards work in parallel. Outputs are printed in order.
+
+        Args:
+            terminal_inputs (list[str]): strings with user inputs
+        """
+
+        # Shard of each reply not received yet, in sending order, and the replies per shard
+        pending = collections.deque()
+        in_flight = [0] * len(self.connections)
+        replies = [collections.deque() for _ in self.connections]
+
+        def receive(shard: int):
+            replies[shard].append(self.connections[shard].recv())
+            in_flight[shard] -= 1
+
+        def print_replies():
+            while pending:
+                shard = pending.popleft()
+                if not replies[shard]:
+                    receive(shard)
+                print(replies[shard].popleft(), end="")
+
+        for terminal_input in terminal_inputs:
+            command, *arguments = terminal_input.rstrip().split(" ")
+
+            requests = None
+            if command in ShardedTerminal.ROUTED_COMMANDS:
+                requests = self.route(command, arguments)
+
+            if requests is None:
+                print_replies()
+                self.interpret_command(terminal_input)
+                continue
+
+            for shard, command_line, path in requests:
+                if in_flight[shard] >= PIPELINE_WINDOW:
+                    receive(shard)
+
+                self.connections[shard].send(("command", command_line, path))
+                in_flight[shard] += 1
+                pending.append(shard)
+
+        print_replies()
+
+
+    def change_path_to(self, path: str):
+        """
+        Updates the current path
+
+        Args:
+            path (str): new absolute path
+        """
+
+        self.last_path = self.current_path
+        self.current_path = path
+
+
+    def close(self):
+        """
+        Stops the shard processes.
+        """
+
+        for connection in self.connections:
+            connection.send(("stop",))
+
+        for process in self.processes:
+            process.join()
@@ -0,0 +1,201 @@
+# External dependencies
+import cProfile
+import io
+import json
+import pstats
+
+# Internal dependencies
+from src.traversal import preorder
+
+
+class Stats:
+    """
+    Collects command latencies and hot path counters.
+    Collection is off by default, the hot paths only check the 'enabled' flag.
+    """
+
+    # Latency histogram bucket upper bounds, in seconds. The last bucket has no bound.
+    LATENCY_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self) -> None:
+
+        self.enabled = False
+        self.profiler: cProfile.Profile = None
+        self.reset()
+
+    # Methods --------------------------------------------------------------------------
+
+    def reset(self) -> None:
+        """
+        Clears every collected value.
+        """
+
+        self.counters: dict[str, int] = dict()
+        self.latency_histograms: dict[str, list[int]] = dict()
+        self.latency_totals: dict[str, float] = dict()
+        self.latency_maximums: dict[str, float] = dict()
+
+
+    def count(self, counter_name: str, amount: int = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            counter_name (str): Counter name.
+            amount (int, optional): Increment. Defaults to 1.
+        """
+
+        self.counters[counter_name] = self.counters.get(counter_name, 0) + amount
+
+
+    def count_lookup(self, scanned_childrens: int) -> None:
+        """
+        Counts a directory lookup and the childrens it compared before returning.
+
+        Args:
+            scanned_childrens (int): Number of childrens compared, up to and including the match.
+        """
+
+        self.count("directory_lookups")
+        self.count("child_scans", scanned_childrens)
+
+
+    def record_latency(self, command: str, seconds: float) -> None:
+        """
+        Adds a command execution time to its histogram.
+
+        Args:
+            command (str): Command name.
+            seconds (float): Execution time.
+        """
+
+        histogram = self.latency_histograms.get(command)
+        if histogram is None:
+            histogram = [0] * (len(Stats.LATENCY_BUCKETS) + 1)
+            self.latency_histograms[command] = histogram
+            self.latency_totals[command] = 0.0
+            self.latency_maximums[command] = 0.0
+
+        bucket = 0
+        while bucket < len(Stats.LATENCY_BUCKETS) and seconds > Stats.LATENCY_BUCKETS[bucket]:
+            bucket += 1
+
+        histogram[bucket] += 1
+        self.latency_totals[command] += seconds
+        self.latency_maximums[command] = max(self.latency_maximums[command], seconds)
+
+
+    def start_profiler(self) -> bool:
+        """
+        Starts profiling every function call with cProfile.
+
+        Returns:
+            bool: True if it was started, False if it was already running.
+        """
+
+        if self.profiler is not None:
+            return False
+
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return True
+
+
+    def stop_profiler(self, lines: int = 20) -> str:
+        """
+        Stops the profiler.
+
+        Args:
+            lines (int, optional): Number of functions in the report. Defaults to 20.
+
+        Returns:
+            str: report of the most expensive functions, or None if it wasn't running.
+        """
+
+        if self.profiler is None:
+            return None
+
+        self.profiler.disable()
+
+        report = io.StringIO()
+        pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(lines)
+        self.profiler = None
+
+        return report.getvalue()
+
+
+    def gauges(self, root) -> dict[str, int]:
+        """
+        Measures the current size of a tree.
+
+        Args:
+            root (Directory): Root directory of the tree.
+
+        Returns:
+            dict[str, int]: number of directories, files and content bytes.
+        """
+
+        directories = 0
+        files = 0
+        content_bytes = 0
+
+        for directory in preorder(root):
+            directories += 1
+
+            for file in directory.file_childrens:
+                files += 1
+                content_bytes += file.size
+
+        return {"directories": directories, "files": files, "content_bytes": content_bytes}
+
+
+    def snapshot(self, root) -> dict:
+        """
+        Collects every value in a JSON serializable dictionary.
+
+        Args:
+            root (Directory): Root directory of the tree, used for the gauges.
+
+        Returns:
+            dict: counters, gauges and latencies by command.
+        """
+
+        latencies = dict()
+
+        for command, histogram in self.latency_histograms.items():
+            calls = sum(histogram)
+            latencies[command] = {
+                "calls": calls,
+                "total_seconds": self.latency_totals[command],
+                "mean_seconds": self.latency_totals[command] / calls,
+                "max_seconds": self.latency_maximums[command],
+                "buckets": dict(zip([str(bound) for bound in Stats.LATENCY_BUCKETS] + ["inf"], histogram)),
+            }
+
+        return {
+            "enabled": self.enabled,
+            "profiling": self.profiler is not None,
+            "counters": dict(self.counters),
+            "gauges": self.gauges(root),
+            "latencies": latencies,
+        }
+
+
+    def dump(self, root) -> str:
+        """
+        Serializes the collected values as JSON.
+
+        Args:
+            root (Directory): Root directory of the tree, used for the gauges.
+
+        Returns:
+            str: JSON document.
+        """
+
+        return json.dumps(self.snapshot(root), indent=2)
+
+
+# Shared by the whole tree, so the hot paths don't need a reference to the terminal
+stats = Stats()
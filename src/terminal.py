@@ -1,7 +1,17 @@
+# External dependencies
+import fnmatch
+import tarfile
+import time
+import zipfile
+
 # Internal dependencies
 from src.file import File
 from src.directory import Directory
 from src.interface import Interface
+from src.archive import Archive
+from src.watcher import Watcher
+from src.stats import stats
+from src.traversal import preorder
 
 # Terminal colors
 RED = '\033[91m'
@@ -17,8 +27,8 @@ class Terminal:
         
         self.root_directory = root_directory
         self.current_directory = root_directory
-        self.path = ""
-        self.last_path = ""
+        self.last_directory = root_directory
+        self.watchers: dict[Directory, Watcher] = dict()
         
         self.commands = {
             "ls": self.command_ls,
@@ -33,6 +43,14 @@ class Terminal:
             "nano": self.command_nano,
             "cat": self.command_cat,
             "interface": self.command_interface,
+            "import": self.command_import,
+            "export": self.command_export,
+            "watch": self.command_watch,
+            "unwatch": self.command_unwatch,
+            "stats": self.command_stats,
+            "quota": self.command_quota,
+            "find": self.command_find,
+            "du": self.command_du,
             "exit": self.command_exit,
             "help": self.command_help
         }
@@ -72,27 +90,7 @@ class Terminal:
         
         #TODO: Filipe e Elias - colocar argumentos '-r', '-t', '-a' (o '-a' seria legal a gnt botar pros arquivos que começam com '.' não aparecerem quando da o ls normal, só com 'ls -a')
 
-        file_objects = []
-        
-        for file in self.current_directory.file_childrens: 
-            file_objects.append(file)
-            
-        for directory in self.current_directory.directory_childrens:    
-            file_objects.append(directory)
-        
-        file_objects = sorted(file_objects, key=lambda x: x.name)
-        
-        if len(file_objects) == 0:
-            return
-        
-        for file_object in file_objects:
-            if not file_object.name.startswith("."): #verifica se comeca com " . "
-                if (isinstance(file_object, Directory)):
-                    print(BLUE + f"{file_object.name} " + RESET, end=" ")
-                else:
-                    print(f"{file_object.name} ", end=" ")
-                
-        print("")
+        self.print_listing(self.list_directory(self.current_directory))
                 
 
     def command_cd(self, terminal_input: list[str]):
@@ -113,13 +111,11 @@ class Terminal:
             self.go_to_root()
             return
         
-        # Saving navigation state
-        last_directory = self.current_directory
-        last_path = self.path
-        
         # Checking if the command intends to navigate from the root folder
         if terminal_input[0][0] == "/":
-            self.go_to_root()
+            directory = self.root_directory
+        else:
+            directory = self.current_directory
 
         # Spliting string to get directories and filtering empty strings
         directories = []
@@ -132,36 +128,37 @@ class Terminal:
             
             # Going back
             if directory_name == "..":
-                if self.current_directory.parent == None:
+                if directory is self.root_directory or directory.parent == None:
                     print(f"cd: Cannot access any folders prior to the root directory")
                     return
-                self.current_directory = self.current_directory.parent
-                self.update_path_to(self.path.rsplit("/", 1)[0])
+                directory = directory.parent
 
-            # Returning to last path
+            # Returning to last directory
             elif directory_name == "-":
                 if len(directories) > 1:
                     print(f"cd: No such file or directory: {terminal_input[0]}")
+                    return
                 
-                else:
-                    self.update_path_to(self.last_path)
+                # The last directory may have been removed since
+                if self.root_directory.common_ancestor(self.last_directory) is not self.root_directory:
+                    print(f"cd: no such file or directory: {terminal_input[0]}")
+                    return
+                
+                directory = self.last_directory
             
             # Going forward
-            elif self.current_directory.check_directory_existence(directory_name):
-                self.current_directory = self.current_directory.find_directory(directory_name)
-                self.update_path_to(self.path + f"/{directory_name}")
+            elif directory.check_directory_existence(directory_name):
+                directory = directory.find_directory(directory_name)
             
-            # Treating the non-existence of the directory
+            # Treating the non-existence of the directory, the navigation state is kept
             else:
-                if self.current_directory.check_file_existence(directory_name):
+                if directory.check_file_existence(directory_name):
                     print(f"cd: not a directory: {terminal_input[0]}")
                 else:
                     print(f"cd: no such file or directory: {terminal_input[0]}")
-                    
-                # Restoring the original navigation state
-
-                self.current_directory = last_directory
-                self.path = last_path
+                return
+        
+        self.change_directory_to(directory)
     
 
     def command_pwd(self, terminal_input: list[str]):
@@ -178,9 +175,7 @@ class Terminal:
             print(f"pwd: too many arguments")
             return
         
-        path = "/" if self.path == "" else self.path
-        
-        print(path)
+        print(self.path)
        
 
     def command_mkdir(self, terminal_input: list[str]):
@@ -192,6 +187,13 @@ class Terminal:
             terminal_input (list[str]): commands from user input
         """
         
+        # Checking for the parents flag
+        make_parents = False
+        
+        if "-p" in terminal_input:
+            make_parents = True
+            terminal_input = [name for name in terminal_input if name != "-p"]
+        
         # Checking if there are wrong arguments
         for command in terminal_input:
             if command[0] == '-':
@@ -200,11 +202,28 @@ class Terminal:
         
         # Creating directories
         for command in terminal_input:
+            if make_parents:
+                directory = self.root_directory if command[0] == "/" else self.current_directory
+                directory_names = command.split("/")
+
+                # Going back for the leading '..', like 'cd', stopping at the root directory
+                while directory_names and directory_names[0] in ("", ".", ".."):
+                    if directory_names.pop(0) == ".." and directory is not self.root_directory:
+                        directory = directory.parent
+
+                directory, error = directory.make_directories(directory_names)
+                if directory is None:
+                    print(f"mkdir: cannot create directory ‘{command}’: {error}")
+                    return
+                continue
+            
             if (self.current_directory.check_existence(command)):
                 print(f"mkdir: cannot create directory ‘{command}’: File exists")
                 return
             
-            self.current_directory.add_child_directory(Directory(command, self.current_directory))
+            if not self.current_directory.add_child_directory(Directory(command, self.current_directory)):
+                print(f"mkdir: cannot create directory ‘{command}’: Disk quota exceeded")
+                return
       
                 
     def command_touch(self, terminal_input: list[str]):
@@ -225,7 +244,8 @@ class Terminal:
         for name in terminal_input:
             if not self.current_directory.check_existence(name):
                 new_file = File(self.current_directory, name)
-                self.current_directory.add_child_file(new_file)
+                if not self.current_directory.add_child_file(new_file):
+                    print(f"touch: cannot touch '{name}': Disk quota exceeded")
        
         
     def command_rm(self, terminal_input: list[str]):
@@ -258,6 +278,9 @@ class Terminal:
                         print("use '-r' flag to remove directories too")
                     else:
                         self.current_directory.remove_child(file_object)
+        
+        # Forgetting the watchers ended by the removal of their directory
+        self.watchers = {directory: watcher for directory, watcher in self.watchers.items() if not watcher.closed}
 
     def command_mv(self, terminal_input: list[str]):
         """
@@ -302,8 +325,7 @@ class Terminal:
                     destination_directory = self.current_directory.find_directory(destination_name)
                     if destination_directory:
                         # Move to destination directory
-                        self.current_directory.remove_child(to_move_object)
-                        destination_directory.add_child_file(to_move_object)
+                        self.move_to(to_move_object, destination_directory)
                     else:
                         # Destination isn't valid directory
                         print(f"O destino '{destination_name}' não é um diretório válido!")
@@ -312,8 +334,7 @@ class Terminal:
                 destination_directory = self.current_directory.find_directory(destination_name)
                 if destination_directory:
                     # Move to destination directory
-                    self.current_directory.remove_child(to_move_object)
-                    destination_directory.add_child_directory(to_move_object)
+                    self.move_to(to_move_object, destination_directory)
                 else:
                     # Destination isn't valid directory
                     print(f"O destino '{destination_name}' não é um diretório válido!")
@@ -390,7 +411,8 @@ class Terminal:
         # Check if file exists
         file = self.current_directory.find_file(file_name)
         if file:
-            file.content = terminal_input[1]
+            if not file.update_content(terminal_input[1]):
+                print(f"nano: cannot write '{file_name}': Disk quota exceeded")
         else:
             print(f"nano: '{file_name}' file not found")
 
@@ -448,6 +470,265 @@ class Terminal:
         interface.display_tree()
          
     
+    def command_import(self, terminal_input: list[str]):
+        """
+        Loads a .tar, .tar.gz or .zip archive into a directory.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        if len(terminal_input) not in (1, 2):
+            print(f"import: invalid arguments")
+            print(f"try: import <archive_path> [directory]")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 2:
+            directory = self.resolve_directory(terminal_input[1])
+            if directory is None:
+                print(f"import: no such directory: {terminal_input[1]}")
+                return
+        
+        try:
+            entries = Archive(directory).load(terminal_input[0])
+        except (OSError, tarfile.TarError, zipfile.BadZipFile) as error:
+            print(f"import: cannot read '{terminal_input[0]}': {error}")
+            return
+        
+        print(f"import: {entries} entries loaded")
+    
+    
+    def command_export(self, terminal_input: list[str]):
+        """
+        Saves a directory as a .tar, .tar.gz or .zip archive.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        if len(terminal_input) not in (1, 2):
+            print(f"export: invalid arguments")
+            print(f"try: export <archive_path> [directory]")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 2:
+            directory = self.resolve_directory(terminal_input[1])
+            if directory is None:
+                print(f"export: no such directory: {terminal_input[1]}")
+                return
+        
+        try:
+            entries = Archive(directory).save(terminal_input[0])
+        except (OSError, ValueError, tarfile.TarError) as error:
+            print(f"export: cannot write '{terminal_input[0]}': {error}")
+            return
+        
+        print(f"export: {entries} entries saved")
+         
+    
+    def command_watch(self, terminal_input: list[str]):
+        """
+        Prints the changes made inside a directory after each command.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        recursive = False
+        
+        if "-r" in terminal_input:
+            recursive = True
+            terminal_input = [name for name in terminal_input if name != "-r"]
+        
+        if len(terminal_input) > 1:
+            print(f"watch: invalid arguments")
+            print(f"try: watch [-r] [directory]")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 1:
+            directory = self.resolve_directory(terminal_input[0])
+            if directory is None:
+                print(f"watch: no such directory: {terminal_input[0]}")
+                return
+        
+        # Replacing the previous watcher of the directory
+        if directory in self.watchers:
+            self.watchers.pop(directory).close()
+        
+        self.watchers[directory] = Watcher(directory, self.print_events, recursive)
+    
+    
+    def command_unwatch(self, terminal_input: list[str]):
+        """
+        Stops printing the changes made inside a directory.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        if len(terminal_input) > 1:
+            print(f"unwatch: invalid arguments")
+            print(f"try: unwatch [directory]")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 1:
+            directory = self.resolve_directory(terminal_input[0])
+        
+        if directory not in self.watchers:
+            print(f"unwatch: directory is not being watched")
+            return
+        
+        self.watchers.pop(directory).close()
+         
+    
+    def command_stats(self, terminal_input: list[str]):
+        """
+        Shows command latencies, lookup counters and tree size.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        usage = "try: stats [on | off | reset | dump [output_path] | profile on | profile off]"
+        
+        if len(terminal_input) == 0:
+            self.print_stats()
+        
+        elif terminal_input == ["on"]:
+            stats.enabled = True
+        
+        elif terminal_input == ["off"]:
+            stats.enabled = False
+        
+        elif terminal_input == ["reset"]:
+            stats.reset()
+        
+        elif terminal_input[0] == "dump" and len(terminal_input) <= 2:
+            if len(terminal_input) == 1:
+                print(stats.dump(self.root_directory))
+                return
+            
+            try:
+                with open(terminal_input[1], "w") as output:
+                    output.write(stats.dump(self.root_directory))
+            except OSError as error:
+                print(f"stats: cannot write '{terminal_input[1]}': {error}")
+        
+        elif terminal_input == ["profile", "on"]:
+            if not stats.start_profiler():
+                print(f"stats: profiler is already running")
+        
+        elif terminal_input == ["profile", "off"]:
+            report = stats.stop_profiler()
+            if report is None:
+                print(f"stats: profiler is not running")
+            else:
+                print(report)
+        
+        else:
+            print(f"stats: invalid arguments")
+            print(usage)
+         
+    
+    def command_quota(self, terminal_input: list[str]):
+        """
+        Shows or sets the entry and content byte quotas of a directory.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        usage = "try: quota show [directory] | quota set <directory> <max_entries | none> <max_bytes | none>"
+        
+        if len(terminal_input) in (1, 2) and terminal_input[0] == "show":
+            directory = self.current_directory
+            if len(terminal_input) == 2:
+                directory = self.resolve_directory(terminal_input[1])
+                if directory is None:
+                    print(f"quota: no such directory: {terminal_input[1]}")
+                    return
+            
+            entry_quota = "none" if directory.entry_quota is None else directory.entry_quota
+            byte_quota = "none" if directory.byte_quota is None else directory.byte_quota
+            
+            print(f"{directory.path}")
+            print(f"{'entries':<10}{directory.subtree_entries:>12} / {entry_quota}")
+            print(f"{'bytes':<10}{directory.subtree_bytes:>12} / {byte_quota}")
+        
+        elif len(terminal_input) == 4 and terminal_input[0] == "set":
+            directory = self.resolve_directory(terminal_input[1])
+            if directory is None:
+                print(f"quota: no such directory: {terminal_input[1]}")
+                return
+            
+            quotas = []
+            for quota in terminal_input[2:]:
+                if quota == "none":
+                    quotas.append(None)
+                elif quota.isdigit():
+                    quotas.append(int(quota))
+                else:
+                    print(f"quota: invalid limit: {quota}")
+                    print(usage)
+                    return
+            
+            directory.entry_quota, directory.byte_quota = quotas
+        
+        else:
+            print(f"quota: invalid arguments")
+            print(usage)
+         
+    
+    def command_find(self, terminal_input: list[str]):
+        """
+        Simulates 'find' terminal command, printing the paths whose name matches a pattern.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        if len(terminal_input) not in (1, 2):
+            print(f"find: invalid arguments")
+            print(f"try: find [directory] <name_pattern>")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 2:
+            directory = self.resolve_directory(terminal_input[0])
+            if directory is None:
+                print(f"find: '{terminal_input[0]}': No such directory")
+                return
+        
+        for path in self.find_paths(directory, terminal_input[-1]):
+            print(path)
+    
+    
+    def command_du(self, terminal_input: list[str]):
+        """
+        Simulates 'du' terminal command, printing the entries and content bytes of a directory.
+
+        Args:
+            terminal_input (list[str]): commands from user input
+        """
+        
+        if len(terminal_input) > 1:
+            print(f"du: too many arguments")
+            return
+        
+        directory = self.current_directory
+        if len(terminal_input) == 1:
+            directory = self.resolve_directory(terminal_input[0])
+            if directory is None:
+                print(f"du: cannot access '{terminal_input[0]}': No such directory")
+                return
+        
+        self.print_usage(directory.subtree_entries, directory.subtree_bytes, directory.path)
+         
+    
     def command_help(self, terminal_input: list[str]):
         # Checking if there are too many arguments
         if (len(terminal_input) > 0):
@@ -466,21 +747,193 @@ class Terminal:
         """
         Collects user command.
         """
-        path = "/" if self.path == "" else self.path
+        return str(input(GREEN + "user@desktop" + RESET + ":" + BLUE + f"{self.path}" + RESET + "$ "))
+    
+    
+    def list_directory(self, directory: Directory) -> list[tuple[str, bool]]:
+        """
+        Lists the childrens of a directory.
+
+        Args:
+            directory (Directory): listed directory
+
+        Returns:
+            list[tuple[str, bool]]: children names, and whether each one is a directory.
+        """
+        
+        file_objects = []
+        
+        for file in directory.file_childrens: 
+            file_objects.append((file.name, False))
             
-        return str(input(GREEN + "user@desktop" + RESET + ":" + BLUE + f"{path}" + RESET + "$ "))
+        for subdir in directory.directory_childrens:    
+            file_objects.append((subdir.name, True))
+        
+        return file_objects
+    
+    
+    def print_listing(self, file_objects: list[tuple[str, bool]]):
+        """
+        Prints children names like 'ls', directories in blue.
+
+        Args:
+            file_objects (list[tuple[str, bool]]): children names, and whether each one is a directory
+        """
+        
+        file_objects = sorted(file_objects)
+        
+        if len(file_objects) == 0:
+            return
+        
+        for name, is_directory in file_objects:
+            if not name.startswith("."): #verifica se comeca com " . "
+                if is_directory:
+                    print(BLUE + f"{name} " + RESET, end=" ")
+                else:
+                    print(f"{name} ", end=" ")
+                
+        print("")
+    
+    
+    def find_paths(self, directory: Directory, pattern: str) -> list[str]:
+        """
+        Finds the directories and files below a directory whose name matches a pattern.
+
+        Args:
+            directory (Directory): directory where the search starts
+            pattern (str): shell style name pattern, like '*.txt'
+
+        Returns:
+            list[str]: sorted absolute paths.
+        """
+        
+        paths = []
+        
+        for subdir in preorder(directory):
+            for file_object in subdir.directory_childrens + subdir.file_childrens:
+                if fnmatch.fnmatchcase(file_object.name, pattern):
+                    paths.append(file_object.path)
+        
+        return sorted(paths)
+    
+    
+    def print_usage(self, entries: int, content_bytes: int, path: str):
+        """
+        Prints a directory usage like 'du'.
+
+        Args:
+            entries (int): entries below the directory
+            content_bytes (int): content bytes below the directory
+            path (str): directory path
+        """
+        
+        print(f"{entries}\t{content_bytes}\t{path}")
+    
+    
+    def print_stats(self):
+        """
+        Prints the collected stats as tables.
+        """
+        
+        snapshot = stats.snapshot(self.root_directory)
+        
+        print(f"collection: {'on' if snapshot['enabled'] else 'off'}, profiler: {'on' if snapshot['profiling'] else 'off'}")
+        
+        for name, value in snapshot["gauges"].items():
+            print(f"{name:<20}{value:>12}")
+        
+        for name, value in sorted(snapshot["counters"].items()):
+            print(f"{name:<20}{value:>12}")
+        
+        if len(snapshot["latencies"]) > 0:
+            print(f"{'command':<12}{'calls':>8}{'mean (ms)':>12}{'max (ms)':>12}")
+        
+        for command, latency in sorted(snapshot["latencies"].items()):
+            print(f"{command:<12}{latency['calls']:>8}{latency['mean_seconds'] * 1000:>12.3f}{latency['max_seconds'] * 1000:>12.3f}")
+    
+    
+    def print_events(self, events: list):
+        """
+        Prints a batch of watched changes.
+
+        Args:
+            events (list[Event]): changes made since the last command
+        """
+        
+        for event in events:
+            if event.old_path is not None:
+                print(f"watch: {event.kind} {event.old_path} -> {event.path}")
+            else:
+                print(f"watch: {event.kind} {event.path}")
+    
+    
+    @property
+    def path(self) -> str:
+        """
+        Absolute path of the current directory.
+        """
+        
+        return self.current_directory.path
     
     
-    def update_path_to(self, new_path: str):
+    def change_directory_to(self, directory: Directory):
         """
-        Updates the current path
+        Updates the current directory
 
         Args:
-            new_path (str): path name
+            directory (Directory): new current directory
+        """
+
+        self.last_directory = self.current_directory
+        self.current_directory = directory
+
+
+    def move_to(self, file_object, destination: Directory):
+        """
+        Moves a child of the current directory, printing why it couldn't be moved.
+
+        Args:
+            file_object (Directory | File): child to be moved
+            destination (Directory): new parent directory
+        """
+        
+        if destination.check_existence(file_object.name):
+            print(f"mv: '{destination.name}/{file_object.name}' already exists!")
+        
+        elif destination is file_object:
+            print(f"mv: cannot move '{file_object.name}' to a subdirectory of itself")
+        
+        elif not self.current_directory.move_child(file_object, destination):
+            print(f"mv: cannot move '{file_object.name}': Disk quota exceeded")
+    
+    
+    def resolve_directory(self, path: str):
         """
+        Finds a directory from a path, absolute or relative to the current directory.
 
-        self.last_path = self.path
-        self.path = new_path
+        Args:
+            path (str): directory path
+
+        Returns:
+            Directory: the directory, or None if it doesn't exist.
+        """
+        
+        directory = self.root_directory if path.startswith("/") else self.current_directory
+        
+        for directory_name in path.split("/"):
+            
+            if directory_name in ("", "."):
+                continue
+            
+            if directory_name == "..":
+                directory = directory.parent
+            else:
+                directory = directory.find_directory(directory_name)
+            
+            if directory is None:
+                return None
+        
+        return directory
 
 
     def interpret_command(self, terminal_input: list[str]):
@@ -495,7 +948,13 @@ class Terminal:
         command = terminal_input[0]
         
         if command in self.commands:
-            self.commands[command](terminal_input[1:])
+            if stats.enabled:
+                start = time.perf_counter()
+                self.commands[command](terminal_input[1:])
+                stats.record_latency(command, time.perf_counter() - start)
+            else:
+                self.commands[command](terminal_input[1:])
+            Watcher.flush_all()
             
         elif command != "":
             print(f"Command {command} not found.")
@@ -505,6 +964,5 @@ class Terminal:
         Goes to root directory
         """
         
-        self.current_directory = self.root_directory
-        self.update_path_to("")
+        self.change_directory_to(self.root_directory)
     
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Directory tree traversals using an explicit stack or queue, so the depth of the
+tree is not limited by the recursion limit. Each traversal is a generator, stopping
+the iteration stops the traversal.
+
+The optional 'prune' callback receives each directory and returns True to skip
+its subdirectories. A pruned directory is still visited.
+"""
+
+# External dependencies
+from collections import deque
+
+
+def preorder(root, prune=None):
+    """
+    Visits each directory before its subdirectories, depth first.
+
+    Args:
+        root (Directory): Root directory of the subtree.
+        prune (Callable[[Directory], bool], optional): Returns True to skip the subdirectories. Defaults to None.
+
+    Yields:
+        Directory: the directories of the subtree, starting from the root.
+    """
+
+    stack = [root]
+
+    while stack:
+        directory = stack.pop()
+        yield directory
+
+        if prune is None or not prune(directory):
+            stack.extend(reversed(directory.directory_childrens))
+
+
+def postorder(root, prune=None):
+    """
+    Visits each directory after its subdirectories, depth first.
+
+    Args:
+        root (Directory): Root directory of the subtree.
+        prune (Callable[[Directory], bool], optional): Returns True to skip the subdirectories. Defaults to None.
+
+    Yields:
+        Directory: the directories of the subtree, ending with the root.
+    """
+
+    # Directories are pushed twice, the second time after their subdirectories were pushed
+    stack = [(root, False)]
+
+    while stack:
+        directory, expanded = stack.pop()
+
+        if expanded:
+            yield directory
+            continue
+
+        stack.append((directory, True))
+
+        if prune is None or not prune(directory):
+            stack.extend((subdir, False) for subdir in reversed(directory.directory_childrens))
+
+
+def breadth_first(root, prune=None):
+    """
+    Visits the directories level by level.
+
+    Args:
+        root (Directory): Root directory of the subtree.
+        prune (Callable[[Directory], bool], optional): Returns True to skip the subdirectories. Defaults to None.
+
+    Yields:
+        Directory: the directories of the subtree, starting from the root.
+    """
+
+    queue = deque([root])
+
+    while queue:
+        directory = queue.popleft()
+        yield directory
+
+        if prune is None or not prune(directory):
+            queue.extend(directory.directory_childrens)
@@ -0,0 +1,168 @@
+class Event:
+    """
+    Represents a change inside a directory.
+    """
+
+    # Event kinds
+    CREATE = "create"
+    DELETE = "delete"
+    MODIFY = "modify"
+    RENAME = "rename"
+    MOVE = "move"
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self, kind: str, directory, file_object, old_name: str = None, old_directory=None):
+        """
+        Args:
+            kind (str): Event kind, one of the Event constants.
+            directory (Directory): Directory where the change happened.
+            file_object (Directory | File): Changed directory or file.
+            old_name (str, optional): Previous name, for rename events. Defaults to None.
+            old_directory (Directory, optional): Previous parent, for move events. Defaults to None.
+        """
+
+        self.kind = kind
+        self.directory = directory
+        self.file_object = file_object
+        self.old_name = old_name
+        self.old_directory = old_directory
+        
+        # Paths are taken now, they may change before the event is delivered
+        self.path = file_object.path
+        self.old_path: str = None
+        
+        if old_name is not None:
+            self.old_path = directory.path.rstrip("/") + "/" + old_name
+        elif old_directory is not None:
+            self.old_path = old_directory.path.rstrip("/") + "/" + file_object.name
+
+    # Methods --------------------------------------------------------------------------
+
+    def key(self) -> tuple:
+        """
+        Identifies equivalent events, used to coalesce repeated ones.
+
+        Returns:
+            tuple: event identity.
+        """
+
+        return (self.kind, id(self.file_object), self.path, self.old_path)
+
+
+class Watcher:
+    """
+    Subscription to the changes of a directory, or of its whole subtree.
+    Events are queued and delivered in batches by flush().
+    """
+
+    # Watchers with queued events, in the order they got them
+    pending_watchers: list["Watcher"] = list()
+
+    # Number of open watchers, mutations skip notifying when there are none
+    open_watchers = 0
+
+    # Constructor ------------------------------------------------------------------------
+
+    def __init__(self, directory, callback, recursive: bool = False):
+        """
+        Args:
+            directory (Directory): Watched directory.
+            callback (Callable[[list[Event]], None]): Receives each batch of events.
+            recursive (bool, optional): Also watch every subdirectory. Defaults to False.
+        """
+
+        self.directory = directory
+        self.callback = callback
+        self.recursive = recursive
+
+        self.events: list[Event] = list()
+        self.last_key: tuple = None
+        self.closed = False
+
+        directory.watchers.append(self)
+        Watcher.open_watchers += 1
+
+    # Methods --------------------------------------------------------------------------
+
+    def push(self, event: Event) -> None:
+        """
+        Queues an event, dropping it if it repeats the last queued one.
+        Only consecutive events are coalesced, so the order of the changes is kept.
+
+        Args:
+            event (Event): Event to be queued.
+        """
+
+        key = event.key()
+        if key == self.last_key:
+            return
+
+        if len(self.events) == 0:
+            Watcher.pending_watchers.append(self)
+
+        self.last_key = key
+        self.events.append(event)
+
+
+    def flush(self) -> None:
+        """
+        Delivers the queued events to the callback.
+        """
+
+        events = self.events
+        self.events = list()
+        self.last_key = None
+
+        if len(events) > 0:
+            self.callback(events)
+
+
+    def close(self) -> None:
+        """
+        Stops watching the directory. Queued events are discarded.
+        """
+
+        self.detach()
+
+        self.events = list()
+        self.last_key = None
+
+
+    def end(self, event: Event) -> None:
+        """
+        Stops watching a directory that was removed. Its delete event is queued last,
+        and the queued events are still delivered.
+
+        Args:
+            event (Event): Delete event of the watched directory.
+        """
+
+        self.push(event)
+        self.detach()
+
+
+    def detach(self) -> None:
+        """
+        Unsubscribes from the directory, so its changes are no longer queued.
+        """
+
+        if self in self.directory.watchers:
+            self.directory.watchers.remove(self)
+            Watcher.open_watchers -= 1
+
+        self.closed = True
+
+
+    @staticmethod
+    def flush_all() -> None:
+        """
+        Delivers the queued events of every watcher.
+        """
+
+        while Watcher.pending_watchers:
+            watchers = Watcher.pending_watchers
+            Watcher.pending_watchers = list()
+
+            for watcher in watchers:
+                watcher.flush()